@@ -0,0 +1,153 @@
+"""ASGI entry point: async-native read routes, everything else served by the Flask app.
+
+    uvicorn asgi:app --workers 4
+
+The hot read paths (health, job board, job detail, feed) run on SQLAlchemy's
+asyncio engine, so a request waiting on PostgreSQL holds no thread, and the
+job detail parts load concurrently on separate connections. All other routes
+are the unchanged Flask views behind a WSGI adapter, so both entry points
+expose the same API. Requires requirements-async.txt.
+"""
+import asyncio
+import contextlib
+import os
+from datetime import datetime
+from a2wsgi import WSGIMiddleware
+from sqlalchemy import or_, select, tuple_
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from starlette.applications import Starlette
+from starlette.middleware import Middleware
+from starlette.middleware.cors import CORSMiddleware
+from starlette.responses import Response
+from starlette.routing import Mount, Route
+
+import app as flask_app
+from models import Job, Escrow, Milestone, Dispute, Post, User, engine_options
+from serializers import dumps, JOB, ESCROW, MILESTONE, DISPUTE, POST, USER_SUMMARY
+
+def async_database_url(database_url):
+    """Map a sync DATABASE_URL onto an asyncio-capable driver"""
+    url = make_url(database_url)
+    if url.get_backend_name() == 'sqlite':
+        return url.set(drivername='sqlite+aiosqlite')
+    if url.get_backend_name() == 'postgresql' and url.get_driver_name() == 'psycopg':
+        return url  # psycopg 3 provides the async dialect under the same name
+    raise ValueError(f'No asyncio driver configured for {url.drivername}')
+
+def async_engine_options(database_url):
+    options = engine_options(database_url)
+    options.pop('poolclass', None)  # async engines need an asyncio-adapted pool
+    return options
+
+flask_app.create_app()
+async_engine = create_async_engine(async_database_url(flask_app.DATABASE_URL),
+                                   **async_engine_options(flask_app.DATABASE_URL))
+AsyncSession = async_sessionmaker(async_engine, expire_on_commit=False)
+
+def json_response(payload, status=200):
+    return Response(dumps(payload), status_code=status, media_type='application/json')
+
+def page_limit(request):
+    return flask_app.parse_page_limit(request.query_params.get('limit'))
+
+async def fetch_all(statement):
+    """Run statement on its own connection, so several can run at once"""
+    async with AsyncSession() as session:
+        return (await session.execute(statement)).all()
+
+async def keyset_page(serializer, model, request, *criteria, extra_columns=()):
+    limit = page_limit(request)
+    statement = select(*serializer.columns, *extra_columns).where(*criteria)
+    cursor = request.query_params.get('cursor')
+    if cursor:
+        created_at, row_id = flask_app.decode_cursor(cursor)
+        statement = statement.where(tuple_(model.created_at, model.id) < tuple_(created_at, row_id))
+    statement = statement.order_by(model.created_at.desc(), model.id.desc()).limit(limit + 1)
+    rows = await fetch_all(statement)
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = flask_app.encode_cursor(rows[-1].created_at, rows[-1].id)
+    return serializer.rows(rows), limit, next_cursor
+
+async def health(request):
+    return json_response({'status': 'healthy', 'timestamp': datetime.utcnow().isoformat()})
+
+async def get_posts(request):
+    try:
+        posts, limit, next_cursor = await keyset_page(POST, Post, request, extra_columns=(Post.created_at,))
+        return json_response({'posts': posts, 'limit': limit, 'next_cursor': next_cursor})
+    except ValueError as e:
+        return json_response({'message': str(e)}, 400)
+    except Exception as e:
+        return json_response({'message': f'Error fetching posts: {str(e)}'}, 500)
+
+async def get_jobs(request):
+    try:
+        jobs, limit, next_cursor = await keyset_page(JOB, Job, request, Job.approved_by_admin == True)
+        return json_response({'jobs': jobs, 'limit': limit, 'next_cursor': next_cursor})
+    except ValueError as e:
+        return json_response({'message': str(e)}, 400)
+    except Exception as e:
+        return json_response({'message': f'Error fetching jobs: {str(e)}'}, 500)
+
+async def get_job(request):
+    """Same payload as the Flask view, with every part loaded concurrently"""
+    job_id = request.path_params['job_id']
+    include = request.query_params.get('include')
+    parts = set(flask_app.JOB_DETAIL_PARTS) if include is None else \
+        {p.strip() for p in include.split(',') if p.strip()}
+    unknown = parts - set(flask_app.JOB_DETAIL_PARTS)
+    if unknown:
+        return json_response({'message': f'Unknown include: {", ".join(sorted(unknown))}'}, 400)
+    try:
+        statements = {'job': select(*JOB.columns).where(Job.id == job_id)}
+        if 'escrow' in parts:
+            statements['escrow'] = select(*ESCROW.columns).where(Escrow.job_id == job_id).limit(1)
+        if 'milestones' in parts:
+            statements['milestones'] = select(*MILESTONE.columns).where(Milestone.job_id == job_id) \
+                .order_by(Milestone.id)
+        if 'disputes' in parts:
+            statements['disputes'] = select(*DISPUTE.columns).where(Dispute.job_id == job_id).order_by(Dispute.id)
+        if parts & {'client', 'expert'}:
+            statements['people'] = select(*USER_SUMMARY.columns).where(or_(
+                User.id == select(Job.client_id).where(Job.id == job_id).scalar_subquery(),
+                User.id == select(Job.expert_id).where(Job.id == job_id).scalar_subquery()
+            ))
+        results = dict(zip(statements, await asyncio.gather(*map(fetch_all, statements.values()))))
+        if not results['job']:
+            return json_response({'message': 'Job not found'}, 404)
+
+        job_data = JOB.row(results['job'][0])
+        if 'escrow' in parts:
+            job_data['escrow'] = ESCROW.row(results['escrow'][0]) if results['escrow'] else None
+        if 'milestones' in parts:
+            job_data['milestones'] = MILESTONE.rows(results['milestones'])
+        if 'disputes' in parts:
+            job_data['disputes'] = DISPUTE.rows(results['disputes'])
+        people = {row.id: USER_SUMMARY.row(row) for row in results.get('people', ())}
+        for role in ('client', 'expert'):
+            if role in parts:
+                job_data[role] = people.get(job_data[f'{role}_id'])
+        return json_response({'job': job_data})
+    except Exception as e:
+        return json_response({'message': f'Error fetching job: {str(e)}'}, 500)
+
+@contextlib.asynccontextmanager
+async def lifespan(app):
+    yield
+    await async_engine.dispose()
+
+app = Starlette(
+    routes=[
+        Route('/api/health', health, methods=['GET']),
+        Route('/api/posts', get_posts, methods=['GET']),
+        Route('/api/jobs', get_jobs, methods=['GET']),
+        Route('/api/jobs/{job_id:int}', get_job, methods=['GET']),
+        # Everything else (auth, writes, escrow, admin, cached catalog) is the Flask app
+        Mount('/', app=WSGIMiddleware(flask_app.app, workers=int(os.getenv('ASGI_WSGI_THREADS', 32)))),
+    ],
+    middleware=[Middleware(CORSMiddleware, allow_origins=['*'], allow_methods=['*'], allow_headers=['*'])],
+    lifespan=lifespan
+)
@@ -0,0 +1,124 @@
+"""Closed-loop HTTP load test comparing running servers at high concurrency.
+
+Start each server in its own shell against the same database, e.g.
+
+    gunicorn -w 4 --threads 32 -b 127.0.0.1:5001 'app:create_app()'   # sync (WSGI)
+    uvicorn asgi:app --workers 4 --port 5002                          # async (ASGI)
+
+then drive both with the same request mix:
+
+    python benchmarks/http_load.py --connections 500 --duration 30 \\
+        --target wsgi=http://127.0.0.1:5001 --target asgi=http://127.0.0.1:5002
+
+Each of --connections keep-alive connections sends its next request as soon
+as the previous response arrives. Only the standard library is used so the
+client itself does not need an event-loop framework.
+"""
+import argparse
+import asyncio
+import json
+import random
+import sys
+import time
+from urllib.parse import urlsplit
+
+DEFAULT_PATHS = ['/api/jobs', '/api/jobs?limit=50', '/api/posts', '/api/health']
+
+async def read_response(reader):
+    status_line = await reader.readline()
+    if not status_line:
+        raise ConnectionError('connection closed')
+    status = int(status_line.split()[1])
+    headers = {}
+    while True:
+        line = await reader.readline()
+        if line in (b'\r\n', b'\n', b''):
+            break
+        name, _, value = line.decode('latin-1').partition(':')
+        headers[name.strip().lower()] = value.strip()
+    if headers.get('transfer-encoding', '').lower() == 'chunked':
+        while True:
+            size = int((await reader.readline()).split(b';')[0], 16)
+            await reader.readexactly(size + 2)
+            if size == 0:
+                break
+    else:
+        await reader.readexactly(int(headers.get('content-length', 0)))
+    return status, headers.get('connection', '').lower() == 'close'
+
+async def worker(host, port, paths, deadline, latencies, errors, rng):
+    reader = writer = None
+    while time.perf_counter() < deadline:
+        try:
+            if writer is None:
+                reader, writer = await asyncio.open_connection(host, port)
+            path = rng.choice(paths)
+            start = time.perf_counter()
+            writer.write(f'GET {path} HTTP/1.1\r\nHost: {host}\r\nConnection: keep-alive\r\n\r\n'.encode())
+            status, closed = await read_response(reader)
+            latencies.append(time.perf_counter() - start)
+            if status >= 500:
+                errors['5xx'] = errors.get('5xx', 0) + 1
+            if closed:
+                writer.close()
+                writer = None
+        except (OSError, ConnectionError, asyncio.IncompleteReadError, ValueError, IndexError) as e:
+            errors[type(e).__name__] = errors.get(type(e).__name__, 0) + 1
+            if writer is not None:
+                writer.close()
+            writer = None
+            await asyncio.sleep(0.01)
+    if writer is not None:
+        writer.close()
+
+async def run_target(url, paths, connections, duration, seed):
+    parts = urlsplit(url)
+    latencies, errors = [], {}
+    deadline = time.perf_counter() + duration
+    start = time.perf_counter()
+    await asyncio.gather(*[
+        worker(parts.hostname, parts.port or 80, paths, deadline, latencies, errors, random.Random(seed + i))
+        for i in range(connections)
+    ])
+    elapsed = time.perf_counter() - start
+    latencies.sort()
+    pick = lambda pct: round(latencies[min(len(latencies) - 1, int(pct / 100 * len(latencies)))] * 1000, 2) \
+        if latencies else None
+    return {
+        'url': url,
+        'connections': connections,
+        'requests': len(latencies),
+        'requests_per_sec': round(len(latencies) / elapsed, 1),
+        'p50_ms': pick(50),
+        'p95_ms': pick(95),
+        'p99_ms': pick(99),
+        'errors': errors
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--target', action='append', required=True, metavar='NAME=URL')
+    parser.add_argument('--connections', type=int, default=500)
+    parser.add_argument('--duration', type=float, default=30, help='seconds per target')
+    parser.add_argument('--path', action='append', dest='paths', help='request path (repeatable)')
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--output', help='write results as JSON to this file')
+    args = parser.parse_args()
+
+    results = {}
+    for target in args.target:
+        name, _, url = target.partition('=')
+        print(f'{name}: {args.connections} connections for {args.duration:.0f}s ...', file=sys.stderr)
+        results[name] = asyncio.run(run_target(url, args.paths or DEFAULT_PATHS, args.connections,
+                                               args.duration, args.seed))
+
+    print(f"{'target':<10} {'req/s':>10} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9}  errors")
+    for name, r in results.items():
+        print(f"{name:<10} {r['requests_per_sec']:>10.1f} {r['p50_ms'] or 0:>9.2f} {r['p95_ms'] or 0:>9.2f} "
+              f"{r['p99_ms'] or 0:>9.2f}  {r['errors'] or '-'}")
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(results, f, indent=2, sort_keys=True)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,61 @@
+"""Logins/sec for the scrypt password hasher under different cost and pool settings.
+
+Usage:
+    python benchmarks/password_kdf.py --logins 200 --workers 1 2 4 8
+
+Each "login" is one verify_password call; --concurrency request threads
+submit them to a pool of --workers KDF threads, as the Flask app does.
+"""
+import argparse
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from passwords import hash_password, verify_password
+
+COST_SETTINGS = [
+    (2 ** 13, 8, 1),
+    (2 ** 14, 8, 1),
+    (2 ** 15, 8, 1),
+    (2 ** 16, 8, 1),
+]
+
+def run(n, r, p, workers, logins, concurrency):
+    stored = hash_password('correct horse battery staple', n=n, r=r, p=p)
+    kdf_pool = ThreadPoolExecutor(max_workers=workers)
+
+    latencies = []
+
+    def login(_):
+        began = time.perf_counter()
+        ok = kdf_pool.submit(verify_password, 'correct horse battery staple', stored).result()
+        latencies.append(time.perf_counter() - began)
+        return ok
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as request_threads:
+        assert all(request_threads.map(login, range(logins)))
+    elapsed = time.perf_counter() - start
+    kdf_pool.shutdown()
+    latencies.sort()
+    return logins / elapsed, latencies[len(latencies) // 2] * 1000
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--logins', type=int, default=100)
+    parser.add_argument('--workers', type=int, nargs='+', default=[1, 2, 4, os.cpu_count() or 1])
+    parser.add_argument('--concurrency', type=int, default=32, help='simulated request threads')
+    args = parser.parse_args()
+
+    print(f"{'n':>7} {'r':>3} {'p':>3} {'mem MiB':>8} {'workers':>8} {'logins/s':>10} {'p50 ms':>9}")
+    for n, r, p in COST_SETTINGS:
+        for workers in sorted(set(args.workers)):
+            rate, latency = run(n, r, p, workers, args.logins, args.concurrency)
+            mem = 128 * n * r / 2 ** 20
+            print(f'{n:>7} {r:>3} {p:>3} {mem:>8.0f} {workers:>8} {rate:>10.1f} {latency:>9.2f}')
+
+if __name__ == '__main__':
+    main()
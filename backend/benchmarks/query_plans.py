@@ -0,0 +1,126 @@
+"""Query-plan regression check: fail when a hot route's query scans a whole table.
+
+Usage:
+    python benchmarks/query_plans.py
+    DATABASE_URL=postgresql+psycopg://... python benchmarks/query_plans.py --no-seed
+
+Runs each hot route from benchmarks/routes.py once against a seeded database,
+records every SELECT/UPDATE/DELETE it sends, and EXPLAINs them with the same
+parameters. On PostgreSQL sequential scans are disabled for the EXPLAIN, so a
+remaining "Seq Scan" means no index can serve the query; on SQLite a bare
+"SCAN <table>" in EXPLAIN QUERY PLAN does. Exits with status 1 listing the
+offending statements, so it can run in CI.
+"""
+import argparse
+import json
+import os
+import re
+import sys
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from routes import Context, build_cases
+
+# Routes that must be served entirely from indexes
+HOT_ROUTES = [
+    'auth_login', 'list_posts', 'list_posts_page2', 'list_jobs', 'list_jobs_page2', 'job_detail',
+    'job_candidates', 'job_submit', 'job_approve', 'job_transition', 'escrow_create', 'escrow_create_replay',
+    'escrow_batch_create_100', 'admin_users_filtered', 'admin_kyc_verify', 'admin_kyc_batch_100',
+    'admin_pending_jobs', 'admin_jobs_approve_100', 'admin_disputes_filtered', 'admin_dispute_resolve',
+    'referral_ancestors', 'referral_descendants', 'referral_count',
+]
+# Catalog tables are small and always listed in full
+SMALL_TABLES = {'courses', 'spaces', 'members', 'events', 'space_members'}
+EXPLAINED = re.compile(r'^\s*(SELECT|UPDATE|DELETE|WITH)\b', re.IGNORECASE)
+# Names a statement defines with WITH; scanning a CTE's own rows is expected
+CTE_NAME = re.compile(r'\b(\w+)\s*(?:\([\w,\s]*\))?\s+AS\s*\(', re.IGNORECASE)
+
+def seq_scans_postgresql(cursor, statement, parameters):
+    cursor.execute('SET enable_seqscan = off')
+    cursor.execute('EXPLAIN (FORMAT JSON) ' + statement, parameters)
+    plan = cursor.fetchone()[0]
+    plan = json.loads(plan) if isinstance(plan, str) else plan
+    scans, nodes = [], [plan[0]['Plan']]
+    while nodes:
+        node = nodes.pop()
+        if node['Node Type'] == 'Seq Scan':
+            scans.append(node['Relation Name'])
+        nodes.extend(node.get('Plans', ()))
+    cursor.execute('RESET enable_seqscan')
+    return scans
+
+def seq_scans_sqlite(cursor, statement, parameters):
+    cursor.execute('EXPLAIN QUERY PLAN ' + statement, parameters)
+    scans = []
+    for row in cursor.fetchall():
+        match = re.match(r'SCAN (\w+)$', row[-1])
+        if match:
+            scans.append(match.group(1))
+    return scans
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--users', type=int, default=2000)
+    parser.add_argument('--jobs', type=int, default=5000)
+    parser.add_argument('--posts', type=int, default=2000)
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--no-seed', action='store_true', help='use DATABASE_URL as is, without reseeding')
+    parser.add_argument('--only', nargs='+', help='route names to check (default: all hot routes)')
+    parser.add_argument('--verbose', action='store_true', help='print every explained statement')
+    args = parser.parse_args()
+
+    if not args.no_seed:
+        if 'DATABASE_URL' not in os.environ:
+            os.environ['DATABASE_URL'] = 'sqlite:///' + os.path.join(tempfile.mkdtemp(), 'query_plans.db')
+        import init_db
+        init_db.DATABASE_URL = os.environ['DATABASE_URL']
+        init_db.seed_database()
+        init_db.bulk_seed(args.users, args.jobs, args.posts, args.seed)
+
+    from sqlalchemy import event
+    import app as app_module
+    app_module.create_app(create_schema=True)
+
+    captured = []
+
+    @event.listens_for(app_module.engine, 'before_cursor_execute')
+    def capture(conn, cursor, statement, parameters, context, executemany):
+        if EXPLAINED.match(statement) and not executemany:
+            captured.append((statement, parameters))
+
+    ctx = Context(app_module)
+    seq_scans = seq_scans_postgresql if app_module.engine.dialect.name == 'postgresql' else seq_scans_sqlite
+    routes = args.only or HOT_ROUTES
+    failures = 0
+    for case in build_cases(1, 1):
+        if case.name not in routes:
+            continue
+        kwargs = case.build(ctx)  # fixtures are created before capturing starts
+        captured.clear()
+        ctx.client.open(method=case.method, **kwargs)
+        statements = {}
+        for statement, parameters in captured:
+            statements.setdefault(statement, parameters)
+        raw = app_module.engine.raw_connection()
+        try:
+            cursor = raw.cursor()
+            for statement, parameters in statements.items():
+                ignored = SMALL_TABLES | set(CTE_NAME.findall(statement))
+                scans = [t for t in seq_scans(cursor, statement, parameters) if t not in ignored]
+                if scans:
+                    failures += 1
+                    print(f'FAIL {case.name}: full scan of {", ".join(scans)}\n    {" ".join(statement.split())}')
+                elif args.verbose:
+                    print(f'ok   {case.name}: {" ".join(statement.split())[:120]}')
+        finally:
+            raw.rollback()
+            raw.close()
+        if not args.verbose:
+            print(f'{case.name:<28} {len(statements):>3} statements explained')
+
+    print(f'{failures} statement(s) scan a whole table' if failures else 'no full table scans', file=sys.stderr)
+    sys.exit(1 if failures else 0)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,318 @@
+"""Latency, throughput and SQL statement counts for every API route.
+
+Usage:
+    python benchmarks/routes.py --output before.json
+    python benchmarks/routes.py --output after.json --compare before.json
+
+Requests go through Flask's test client, so no server is needed. By default a
+throwaway SQLite database is created and bulk seeded; set DATABASE_URL and pass
+--no-seed to run against an already seeded PostgreSQL database instead (the run
+adds its own fixture users and jobs to it). Any 4xx/5xx response marks its
+route as failed: failed routes are listed after the table and the run exits
+with status 1.
+"""
+import argparse
+import json
+import os
+import platform
+import statistics
+import sys
+import tempfile
+import time
+from collections import Counter, namedtuple
+from datetime import datetime
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# One request scenario; build(ctx) runs untimed before each request and returns
+# the keyword arguments for client.open (path, json, headers, ...)
+Case = namedtuple('Case', ['name', 'group', 'method', 'build', 'iterations'])
+
+def percentile(sorted_values, pct):
+    index = min(len(sorted_values) - 1, int(round(pct / 100 * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+def bearer(token):
+    return {'Authorization': f'Bearer {token}'}
+
+class Context:
+    """Fixture users, tokens and factories shared by the cases"""
+
+    def __init__(self, app_module):
+        self.app = app_module
+        self.client = app_module.app.test_client()
+        self.counter = 0
+        self.admin_token = self.register('admin')['token']
+        company = self.register('company')
+        self.company_id, self.company_token = company['user']['id'], company['token']
+        self.login_email = self.register('company')['email']
+        self.expert_id = self.register('expert')['user']['id']
+        self.arbitrator_id = self.register('arbitrator')['user']['id']
+        self.job_id = self.new_job(approved=True)
+        self.jobs_cursor = self.client.get('/api/jobs?limit=20').get_json().get('next_cursor')
+        self.posts_cursor = self.client.get('/api/posts?limit=20').get_json().get('next_cursor')
+        self.referrer_id, self.referred_id = self.referral_ids()
+
+    def unique(self, prefix):
+        self.counter += 1
+        return f'{prefix}-{os.getpid()}-{time.time_ns()}-{self.counter}'
+
+    def register(self, role):
+        email = self.unique(f'bench-{role}') + '@example.com'
+        response = self.client.post('/api/auth/register', json={
+            'name': f'Bench {role.title()}', 'email': email, 'password': 'bench-password', 'role': role
+        })
+        data = response.get_json()
+        data['email'] = email
+        return data
+
+    def new_job(self, approved=False, status=None):
+        return self.new_jobs(1, approved, status)[0]
+
+    def new_jobs(self, count, approved=False, status=None):
+        from models import Job, JobStatus, ServiceType
+        session = self.app.db_session()
+        status = status or (JobStatus.ACTIVE if approved else JobStatus.DRAFT)
+        jobs = [Job(title='Benchmark job', description='Created by benchmarks/routes.py',
+                    service_type=ServiceType.GUIDED_TRUST, budget=1500, client_id=self.company_id,
+                    status=status, approved_by_admin=approved)
+                for _ in range(count)]
+        session.add_all(jobs)
+        session.commit()
+        job_ids = [job.id for job in jobs]
+        self.app.db_session.remove()
+        return job_ids
+
+    def new_pending_jobs(self, count):
+        from models import JobStatus
+        return self.new_jobs(count, status=JobStatus.PENDING_APPROVAL)
+
+    def new_dispute(self):
+        from models import Dispute, Escrow, EscrowStatus, DisputeStatus
+        job_id = self.new_job(approved=True)
+        session = self.app.db_session()
+        session.add(Escrow(job_id=job_id, total_amount=1500, platform_fee=105, status=EscrowStatus.DISPUTED))
+        dispute = Dispute(job_id=job_id, opened_by_id=self.company_id, reason='Benchmark dispute',
+                          status=DisputeStatus.OPEN)
+        session.add(dispute)
+        session.commit()
+        dispute_id = dispute.id
+        self.app.db_session.remove()
+        return dispute_id
+
+    def new_user_id(self):
+        return self.register('expert')['user']['id']
+
+    def referral_ids(self):
+        """(oldest recommender, newest recommended user): the widest subtree and a deep chain"""
+        from sqlalchemy import func
+        from models import User
+        session = self.app.db_session()
+        low, high = session.query(func.min(User.recommended_by_id), func.max(User.id)) \
+            .filter(User.recommended_by_id.isnot(None)).one()
+        self.app.db_session.remove()
+        return low or self.company_id, high or self.company_id
+
+def build_cases(iterations, auth_iterations):
+    def get(path, headers=None):
+        return lambda ctx: {'path': path(ctx) if callable(path) else path, 'headers': headers(ctx) if headers else None}
+
+    admin = lambda ctx: bearer(ctx.admin_token)
+    company = lambda ctx: bearer(ctx.company_token)
+    n, k = iterations, auth_iterations
+    return [
+        Case('health', 'meta', 'GET', get('/api/health'), n),
+        Case('health_db', 'meta', 'GET', get('/api/health/db'), n),
+
+        Case('auth_register', 'auth', 'POST', lambda ctx: {'path': '/api/auth/register', 'json': {
+            'name': 'Bench User', 'email': ctx.unique('reg') + '@example.com', 'password': 'bench-password'}}, k),
+        Case('auth_login', 'auth', 'POST', lambda ctx: {'path': '/api/auth/login', 'json': {
+            'email': ctx.login_email, 'password': 'bench-password'}}, k),
+        Case('auth_logout', 'auth', 'POST', lambda ctx: {'path': '/api/auth/logout',
+                                                          'headers': bearer(ctx.register('company')['token'])}, k),
+
+        Case('list_posts', 'listing', 'GET', get('/api/posts'), n),
+        Case('list_posts_page2', 'listing', 'GET', get(lambda ctx: f'/api/posts?cursor={ctx.posts_cursor or ""}'), n),
+        Case('list_courses', 'listing', 'GET', get('/api/courses'), n),
+        Case('list_spaces', 'listing', 'GET', get('/api/spaces'), n),
+        Case('list_members', 'listing', 'GET', get('/api/members'), n),
+        Case('list_events', 'listing', 'GET', get('/api/events'), n),
+        Case('list_jobs', 'listing', 'GET', get('/api/jobs'), n),
+        Case('list_jobs_page2', 'listing', 'GET', get(lambda ctx: f'/api/jobs?cursor={ctx.jobs_cursor or ""}'), n),
+
+        Case('job_create', 'jobs', 'POST', lambda ctx: {'path': '/api/jobs', 'json': {
+            'title': 'Benchmark job', 'description': 'Created by the benchmark', 'service_type': 'direct_trust',
+            'budget': 900, 'client_id': ctx.company_id}}, n),
+        Case('job_detail', 'jobs', 'GET', get(lambda ctx: f'/api/jobs/{ctx.job_id}'), n),
+        Case('job_candidates', 'jobs', 'GET', get(lambda ctx: f'/api/jobs/{ctx.job_id}/candidates'), n),
+        Case('job_submit', 'jobs', 'POST', lambda ctx: {
+            'path': f'/api/jobs/{ctx.new_job()}/submit', 'headers': bearer(ctx.company_token)}, n),
+        Case('job_approve', 'jobs', 'POST', lambda ctx: {
+            'path': f'/api/jobs/{ctx.new_pending_jobs(1)[0]}/approve', 'headers': admin(ctx)}, n),
+        Case('job_transition', 'jobs', 'POST', lambda ctx: {
+            'path': f'/api/jobs/{ctx.new_job(approved=True)}/transition', 'headers': bearer(ctx.company_token),
+            'json': {'status': 'closed', 'version': 1}}, n),
+
+        Case('referral_ancestors', 'referrals', 'GET',
+             get(lambda ctx: f'/api/users/{ctx.referred_id}/referrals/ancestors', company), n),
+        Case('referral_descendants', 'referrals', 'GET',
+             get(lambda ctx: f'/api/users/{ctx.referrer_id}/referrals/descendants', company), n),
+        Case('referral_count', 'referrals', 'GET',
+             get(lambda ctx: f'/api/users/{ctx.referrer_id}/referrals/count', company), n),
+
+        Case('escrow_create', 'escrow', 'POST', lambda ctx: {'path': '/api/escrow',
+                                                              'json': {'job_id': ctx.new_job(approved=True)}}, n),
+        Case('escrow_create_replay', 'escrow', 'POST', lambda ctx: {
+            'path': '/api/escrow', 'json': {'job_id': ctx.job_id}, 'headers': {'Idempotency-Key': 'bench-replay'}}, n),
+        Case('escrow_batch_create_100', 'escrow', 'POST', lambda ctx: {
+            'path': '/api/escrow/batch', 'headers': admin(ctx),
+            'json': {'action': 'create', 'job_ids': ctx.new_jobs(100, approved=True)}}, k),
+
+        Case('admin_users', 'admin', 'GET', get('/api/admin/users', admin), n),
+        Case('admin_users_filtered', 'admin', 'GET', get('/api/admin/users?role=expert&kyc_status=pending', admin), n),
+        Case('admin_kyc_verify', 'admin', 'POST', lambda ctx: {
+            'path': f'/api/admin/kyc/{ctx.new_user_id()}/verify', 'headers': admin(ctx)}, k),
+        Case('admin_kyc_reject', 'admin', 'POST', lambda ctx: {
+            'path': f'/api/admin/kyc/{ctx.new_user_id()}/reject', 'headers': admin(ctx), 'json': {}}, k),
+        Case('admin_kyc_batch_100', 'admin', 'POST', lambda ctx: {
+            'path': '/api/admin/kyc/batch', 'headers': admin(ctx),
+            'json': {'action': 'verify', 'user_ids': list(range(1, 101))}}, k),
+        Case('admin_pending_jobs', 'admin', 'GET', get('/api/admin/jobs/pending', admin), n),
+        Case('admin_jobs_approve_100', 'admin', 'POST', lambda ctx: {
+            'path': '/api/admin/jobs/batch', 'headers': admin(ctx),
+            'json': {'action': 'approve', 'job_ids': ctx.new_pending_jobs(100)}}, k),
+        Case('admin_disputes', 'admin', 'GET', get('/api/admin/disputes', admin), n),
+        Case('admin_disputes_filtered', 'admin', 'GET', get('/api/admin/disputes?status=open', admin), n),
+        Case('admin_dispute_assign', 'admin', 'POST', lambda ctx: {
+            'path': f'/api/admin/disputes/{ctx.new_dispute()}/assign', 'headers': admin(ctx),
+            'json': {'arbitrator_id': ctx.arbitrator_id}}, n),
+        Case('admin_dispute_resolve', 'admin', 'POST', lambda ctx: {
+            'path': f'/api/admin/disputes/{ctx.new_dispute()}/resolve', 'headers': admin(ctx),
+            'json': {'resolution': 'Benchmark resolution', 'winner': 'expert'}}, n),
+        Case('admin_stats', 'admin', 'GET', get('/api/admin/stats', admin), n),
+        Case('admin_auth_cache', 'admin', 'GET', get('/api/admin/auth/cache', admin), n),
+        Case('admin_expert_index', 'admin', 'GET', get('/api/admin/expert-index', admin), n),
+    ]
+
+def run_case(ctx, case, warmup, statements):
+    for _ in range(warmup):
+        ctx.client.open(method=case.method, **case.build(ctx))
+    latencies, counts, codes = [], [], Counter()
+    error = None
+    for _ in range(case.iterations):
+        kwargs = case.build(ctx)
+        before = statements[0]
+        start = time.perf_counter()
+        response = ctx.client.open(method=case.method, **kwargs)
+        latencies.append(time.perf_counter() - start)
+        counts.append(statements[0] - before)
+        codes[response.status_code] += 1
+        if response.status_code >= 400 and error is None:
+            body = response.get_json(silent=True) or {}
+            error = f"{response.status_code} {body.get('message', response.status)}"
+    latencies.sort()
+    return {
+        'group': case.group,
+        'method': case.method,
+        'iterations': case.iterations,
+        'p50_ms': round(percentile(latencies, 50) * 1000, 3),
+        'p95_ms': round(percentile(latencies, 95) * 1000, 3),
+        'p99_ms': round(percentile(latencies, 99) * 1000, 3),
+        'mean_ms': round(statistics.fmean(latencies) * 1000, 3),
+        'requests_per_sec': round(len(latencies) / sum(latencies), 1),
+        'sql_statements': round(statistics.fmean(counts), 2),
+        'sql_statements_max': max(counts),
+        'status_codes': {str(code): count for code, count in sorted(codes.items())},
+        # Error responses are timed like the rest, so a route with any is not a valid sample
+        'failures': sum(count for code, count in codes.items() if code >= 400),
+        'first_error': error
+    }
+
+def print_results(results, baseline=None):
+    header = f"{'route':<24} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'req/s':>9} {'sql':>6}  status"
+    if baseline:
+        header += '   Δp50     Δsql'
+    print(header)
+    for name, r in results.items():
+        line = (f"{name:<24} {r['p50_ms']:>9.2f} {r['p95_ms']:>9.2f} {r['p99_ms']:>9.2f} "
+                f"{r['requests_per_sec']:>9.1f} {r['sql_statements']:>6.1f}  {','.join(r['status_codes'])}")
+        old = (baseline or {}).get(name)
+        if old:
+            delta = (r['p50_ms'] - old['p50_ms']) / old['p50_ms'] * 100 if old['p50_ms'] else 0.0
+            line += f"   {delta:+6.1f}%  {r['sql_statements'] - old['sql_statements']:+6.1f}"
+        print(line)
+    failed = {name: r for name, r in results.items() if r.get('failures')}
+    if failed:
+        print(f'\nFAILED ({len(failed)} route(s) returned errors; their timings are not valid):')
+        for name, r in failed.items():
+            print(f"  {name:<24} {r['failures']}/{r['iterations']} failed, first: {r['first_error']}")
+    return failed
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--iterations', type=int, default=200, help='timed requests per route')
+    parser.add_argument('--auth-iterations', type=int, default=20,
+                        help='timed requests for routes dominated by password hashing')
+    parser.add_argument('--warmup', type=int, default=5)
+    parser.add_argument('--users', type=int, default=2000)
+    parser.add_argument('--jobs', type=int, default=5000)
+    parser.add_argument('--posts', type=int, default=5000)
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--no-seed', action='store_true', help='use DATABASE_URL as is, without reseeding')
+    parser.add_argument('--only', nargs='+', help='route names or groups to run')
+    parser.add_argument('--output', help='write results as JSON to this file')
+    parser.add_argument('--compare', help='JSON results of an earlier run to diff against')
+    args = parser.parse_args()
+
+    if not args.no_seed:
+        if 'DATABASE_URL' not in os.environ:
+            os.environ['DATABASE_URL'] = 'sqlite:///' + os.path.join(tempfile.mkdtemp(), 'benchmark.db')
+        import init_db
+        init_db.DATABASE_URL = os.environ['DATABASE_URL']
+        init_db.seed_database()
+        init_db.bulk_seed(args.users, args.jobs, args.posts, args.seed)
+
+    from sqlalchemy import event
+    import app as app_module
+    app_module.create_app(create_schema=True)
+
+    statements = [0]
+
+    @event.listens_for(app_module.engine, 'before_cursor_execute')
+    def count_statement(*_):
+        statements[0] += 1
+
+    ctx = Context(app_module)
+
+    results = {}
+    for case in build_cases(args.iterations, args.auth_iterations):
+        if args.only and case.name not in args.only and case.group not in args.only:
+            continue
+        print(f'running {case.name} ...', file=sys.stderr)
+        results[case.name] = run_case(ctx, case, args.warmup, statements)
+
+    baseline = None
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)['routes']
+    failed = print_results(results, baseline)
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump({
+                'meta': {
+                    'timestamp': datetime.utcnow().isoformat(),
+                    'database': app_module.engine.dialect.name,
+                    'python': platform.python_version(),
+                    'iterations': args.iterations,
+                    'auth_iterations': args.auth_iterations,
+                    'seed': None if args.no_seed else {
+                        'users': args.users, 'jobs': args.jobs, 'posts': args.posts, 'seed': args.seed}
+                },
+                'routes': results
+            }, f, indent=2, sort_keys=True)
+        print(f'results written to {args.output}', file=sys.stderr)
+    sys.exit(1 if failed else 0)
+
+if __name__ == '__main__':
+    main()
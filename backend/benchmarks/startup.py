@@ -0,0 +1,125 @@
+"""Startup profile: import and initialization time per phase, cold and pre-forked.
+
+Usage:
+    python benchmarks/startup.py --runs 5
+    python benchmarks/startup.py --runs 5 --imports 15 --output startup.json
+
+Every run is a fresh interpreter. "cold" imports and initializes everything in
+that process, as a worker without a preloading master does. "forked" does the
+imports and app.preload() first, then forks and times only what a gunicorn
+worker still does after the fork: create_app(), its first database connection
+and its first request. --imports lists the modules with the largest cumulative
+import time (from python -X importtime). Without DATABASE_URL a throwaway SQLite
+database is used; the schema is created up front, outside the timed phases.
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+
+BACKEND = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+PROBE = r'''
+import json, os, sys, time
+sys.path.insert(0, BACKEND)
+phases = {}
+mark = time.perf_counter()
+
+def phase(name):
+    global mark
+    now = time.perf_counter()
+    phases[name] = (now - mark) * 1000
+    mark = now
+
+import flask; phase('import flask')
+import sqlalchemy.orm; phase('import sqlalchemy')
+import models; phase('import models')
+import app; phase('import app')
+
+def serve():
+    app.create_app(); phase('create_app')
+    app.engine.connect().close(); phase('first connection')
+    response = app.app.test_client().get('/api/jobs?limit=20'); phase('first request')
+    assert response.status_code == 200, response.status_code
+    app.engine.dispose()
+
+if MODE == 'forked':
+    app.preload(); phase('preload')
+    read_fd, write_fd = os.pipe()
+    pid = os.fork()
+    if pid == 0:
+        phases.clear()
+        mark = time.perf_counter()
+        serve()
+        os.write(write_fd, json.dumps(phases).encode())
+        os._exit(0)
+    os.close(write_fd)
+    child = json.loads(os.read(read_fd, 65536))
+    os.waitpid(pid, 0)
+    phases.update({f'worker: {name}': ms for name, ms in child.items()})
+else:
+    serve()
+print(json.dumps(phases))
+'''
+
+def run_probe(mode):
+    code = f'BACKEND = {BACKEND!r}\nMODE = {mode!r}\n' + PROBE
+    out = subprocess.run([sys.executable, '-c', code], capture_output=True, text=True, check=True).stdout
+    return json.loads(out.strip().splitlines()[-1])
+
+def import_profile(top):
+    """Largest cumulative import times (ms) for `import app`, from -X importtime"""
+    err = subprocess.run([sys.executable, '-X', 'importtime', '-c', 'import app'], cwd=BACKEND,
+                         capture_output=True, text=True, check=True).stderr
+    totals = {}
+    for line in err.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        _, cumulative, name = line[len('import time:'):].split('|')
+        name = name.strip()
+        if '.' not in name and name != 'app':
+            totals[name] = max(totals.get(name, 0), int(cumulative) / 1000)
+    return sorted(totals.items(), key=lambda item: -item[1])[:top]
+
+def summarize(runs):
+    return {name: round(statistics.median(run[name] for run in runs), 1) for name in runs[0]}
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--runs', type=int, default=5)
+    parser.add_argument('--modes', nargs='+', choices=['cold', 'forked'], default=['cold', 'forked'])
+    parser.add_argument('--imports', type=int, default=10, help='slowest top-level imports to list (0 = none)')
+    parser.add_argument('--output', help='write results as JSON to this file')
+    args = parser.parse_args()
+
+    if 'DATABASE_URL' not in os.environ:
+        os.environ['DATABASE_URL'] = 'sqlite:///' + os.path.join(tempfile.mkdtemp(), 'startup.db')
+    sys.path.insert(0, BACKEND)
+    from schema import create_schema
+    create_schema(os.environ['DATABASE_URL'])
+
+    results = {}
+    for mode in args.modes:
+        phases = summarize([run_probe(mode) for _ in range(args.runs)])
+        results[mode] = phases
+        print(f'{mode} (median of {args.runs} runs)')
+        for name, ms in phases.items():
+            print(f'  {name:<28} {ms:>8.1f} ms')
+        worker = [ms for name, ms in phases.items() if mode == 'cold' or name.startswith('worker: ')]
+        print(f"  {'ready to serve':<28} {sum(worker):>8.1f} ms")
+
+    if args.imports:
+        results['imports'] = import_profile(args.imports)
+        print('slowest top-level imports of app (cumulative)')
+        for name, ms in results['imports']:
+            print(f'  {name:<28} {ms:>8.1f} ms')
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(results, f, indent=2)
+
+if __name__ == '__main__':
+    main()
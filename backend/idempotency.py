@@ -0,0 +1,39 @@
+import hashlib
+import os
+from datetime import datetime, timedelta
+from models import IdempotencyKey
+
+# How long a stored response is replayed for a retried Idempotency-Key
+IDEMPOTENCY_KEY_TTL = timedelta(seconds=int(os.getenv('IDEMPOTENCY_KEY_TTL', 24 * 3600)))
+MAX_KEY_LENGTH = 255
+
+class IdempotencyConflict(Exception):
+    """The key was already used for a request with a different method, path or body"""
+
+def request_hash(method, path, body):
+    digest = hashlib.sha256()
+    for part in (method.encode(), path.encode(), body):
+        digest.update(part)
+        digest.update(b'\0')
+    return digest.hexdigest()
+
+def find_response(session, endpoint, key, fingerprint):
+    """Return the stored (status_code, body) for key, or None if it is unused or expired"""
+    row = session.query(IdempotencyKey.request_hash, IdempotencyKey.status_code, IdempotencyKey.response_body) \
+        .filter(IdempotencyKey.endpoint == endpoint, IdempotencyKey.key == key,
+                IdempotencyKey.expires_at > datetime.utcnow()).first()
+    if row is None:
+        return None
+    if row.request_hash != fingerprint:
+        raise IdempotencyConflict('Idempotency-Key was already used for a different request')
+    return row.status_code, row.response_body
+
+def store_response(session, endpoint, key, fingerprint, status_code, body):
+    """Add the response to session, so it commits or rolls back with the write it describes"""
+    now = datetime.utcnow()
+    # An expired row for the same key would otherwise trip the unique constraint
+    session.query(IdempotencyKey).filter(IdempotencyKey.endpoint == endpoint, IdempotencyKey.key == key,
+                                         IdempotencyKey.expires_at <= now).delete(synchronize_session=False)
+    session.add(IdempotencyKey(endpoint=endpoint, key=key, request_hash=fingerprint, status_code=status_code,
+                               response_body=body.decode() if isinstance(body, bytes) else body,
+                               created_at=now, expires_at=now + IDEMPOTENCY_KEY_TTL))
@@ -0,0 +1,66 @@
+import re
+import time
+from collections import Counter
+from flask import g, has_request_context, request
+from sqlalchemy import event
+
+# Collapse literals and expanded IN lists so that "same query, different ids" share a shape
+_NUMBER = re.compile(r'\b\d+\b')
+_STRING = re.compile(r"'(?:[^']|'')*'")
+_IN_LIST = re.compile(r'\(\s*(?:\?|%\(\w+\)s|:\w+|\$\d+|%s)(?:\s*,\s*(?:\?|%\(\w+\)s|:\w+|\$\d+|%s))*\s*\)')
+_WHITESPACE = re.compile(r'\s+')
+
+def statement_shape(statement):
+    shape = _STRING.sub('?', statement)
+    shape = _NUMBER.sub('?', shape)
+    shape = _IN_LIST.sub('(...)', shape)
+    return _WHITESPACE.sub(' ', shape).strip()
+
+def install_query_instrumentation(app, repeat_threshold=5):
+    """Count statements and DB time per request, report them and flag N+1 patterns.
+
+    Each response gets a Server-Timing header (db time and statement count,
+    plus total request time) and a debug log line. Requests that run one
+    statement shape more than repeat_threshold times are logged as warnings.
+    Call at import time, before the app serves a request; statements are only
+    counted on engines passed to instrument_engine().
+    """
+
+    @app.before_request
+    def start_query_stats():
+        g.request_start = time.perf_counter()
+        g.sql_count = 0
+        g.sql_time = 0.0
+        g.sql_shapes = Counter()
+
+    @app.after_request
+    def report_query_stats(response):
+        if 'sql_shapes' not in g:
+            return response
+        total_ms = (time.perf_counter() - g.request_start) * 1000
+        db_ms = g.sql_time * 1000
+        response.headers.add('Server-Timing', f'db;dur={db_ms:.2f};desc="{g.sql_count} queries"')
+        response.headers.add('Server-Timing', f'app;dur={total_ms:.2f}')
+        app.logger.debug('%s %s -> %s: %d queries, db %.2f ms, total %.2f ms',
+                         request.method, request.path, response.status_code, g.sql_count, db_ms, total_ms)
+        repeated = [(shape, n) for shape, n in g.sql_shapes.most_common() if n > repeat_threshold]
+        for shape, n in repeated:
+            app.logger.warning('Possible N+1 in %s %s: statement ran %d times: %s',
+                               request.method, request.path, n, shape[:300])
+        return response
+
+def instrument_engine(engine):
+    """Time every statement on engine for the per-request stats of install_query_instrumentation"""
+
+    @event.listens_for(engine, 'before_cursor_execute')
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault('query_start_time', []).append(time.perf_counter())
+
+    @event.listens_for(engine, 'after_cursor_execute')
+    def after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        elapsed = time.perf_counter() - conn.info['query_start_time'].pop()
+        if not has_request_context() or 'sql_shapes' not in g:
+            return
+        g.sql_count += 1
+        g.sql_time += elapsed
+        g.sql_shapes[statement_shape(statement)] += 1
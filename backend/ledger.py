@@ -0,0 +1,91 @@
+from datetime import datetime
+from decimal import Decimal, ROUND_HALF_UP
+from sqlalchemy import insert, update
+from models import Job, Escrow, ServiceType, EscrowStatus
+
+# Platform fee as a fraction of the job budget, by service type
+PLATFORM_FEE_RATES = {
+    ServiceType.DIRECT_TRUST: Decimal('0.02'),
+    ServiceType.GUIDED_TRUST: Decimal('0.07'),
+    ServiceType.DELEGATED_TRUST: Decimal('0.15')
+}
+DEFAULT_FEE_RATE = Decimal('0.05')
+CENT = Decimal('0.01')
+MAX_BATCH_SIZE = 1000
+
+def to_money(value):
+    """Exact Decimal rounded half-up to cents; floats go through str() to drop binary noise"""
+    if not isinstance(value, Decimal):
+        value = Decimal(str(value))
+    return value.quantize(CENT, rounding=ROUND_HALF_UP)
+
+def platform_fee(budget, service_type):
+    return to_money(to_money(budget) * PLATFORM_FEE_RATES.get(service_type, DEFAULT_FEE_RATE))
+
+def totals(escrows):
+    """Gross, fee and net-to-expert sums over (total_amount, platform_fee) pairs"""
+    gross = sum((to_money(total) for total, _ in escrows), Decimal('0.00'))
+    fees = sum((to_money(fee) for _, fee in escrows), Decimal('0.00'))
+    return {'gross': gross, 'platform_fees': fees, 'net': gross - fees}
+
+def _returning(columns):
+    """columns in their given order, plus job_id at the end when they lack it"""
+    columns = tuple(columns)
+    return columns if any(column is Escrow.job_id for column in columns) else columns + (Escrow.job_id,)
+
+def _locked_jobs(session, job_ids):
+    """id -> (budget, service_type), row-locked in id order so concurrent batches cannot deadlock"""
+    rows = session.query(Job.id, Job.budget, Job.service_type).filter(Job.id.in_(job_ids)) \
+        .order_by(Job.id).with_for_update().all()
+    return {row.id: row for row in rows}
+
+def create_escrows(session, job_ids, returning=()):
+    """Create escrows for every job in job_ids that has none, with one bulk INSERT.
+
+    Returns (results, created rows): results maps each job id to 'created',
+    'exists' or 'not_found'; created rows carry the returning columns. The
+    caller commits.
+    """
+    jobs = _locked_jobs(session, job_ids)
+    existing = {job_id for job_id, in session.query(Escrow.job_id).filter(Escrow.job_id.in_(list(jobs)))}
+    now = datetime.utcnow()
+    values = [{
+        'job_id': job.id,
+        'total_amount': to_money(job.budget),
+        'platform_fee': platform_fee(job.budget, job.service_type),
+        'status': EscrowStatus.CREATED,
+        'created_at': now,
+        'updated_at': now
+    } for job_id, job in jobs.items() if job_id not in existing]
+    created = []
+    if values:
+        statement = insert(Escrow).returning(*_returning(returning))
+        created = session.execute(statement, values).all()
+    results = {job_id: 'not_found' for job_id in job_ids}
+    results.update({job_id: 'exists' for job_id in existing})
+    results.update({row.job_id: 'created' for row in created})
+    return results, created
+
+def fund_escrows(session, job_ids, returning=()):
+    """Move the CREATED escrows of job_ids to FUNDED with one set-based UPDATE.
+
+    Returns (results, funded rows): results maps each job id to 'funded',
+    'not_found' or 'already_<status>' for an escrow past CREATED.
+    The caller commits.
+    """
+    now = datetime.utcnow()
+    funded = session.execute(
+        update(Escrow)
+        .where(Escrow.job_id.in_(job_ids), Escrow.status == EscrowStatus.CREATED)
+        .values(status=EscrowStatus.FUNDED, funded_at=now, updated_at=now)
+        .returning(*_returning(returning))
+        .execution_options(synchronize_session=False)
+    ).all()
+    results = {job_id: 'not_found' for job_id in job_ids}
+    funded_ids = {row.job_id for row in funded}
+    remaining = [job_id for job_id in job_ids if job_id not in funded_ids]
+    if remaining:
+        for job_id, status in session.query(Escrow.job_id, Escrow.status).filter(Escrow.job_id.in_(remaining)):
+            results[job_id] = f'already_{status.value}'
+    results.update({job_id: 'funded' for job_id in funded_ids})
+    return results, funded
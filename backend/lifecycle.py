@@ -0,0 +1,95 @@
+"""Job lifecycle: the allowed status transitions and the conditional UPDATE that applies one.
+
+Every status change runs as UPDATE jobs ... WHERE id = :id AND status = :expected
+AND version = :version, bumping the version. When two requests race on the
+same job only one matches the row; the other gets TransitionConflict instead of
+silently overwriting it, and neither holds a row lock while deciding.
+"""
+from collections import namedtuple
+from datetime import datetime
+from sqlalchemy import update
+from models import Job, JobStatus, UserRole
+
+# Parties to a job; admins may take every transition. COMPLETED and CLOSED are final.
+CLIENT, EXPERT = 'client', 'expert'
+
+# values are extra columns set by the transition; assigns_expert lets the caller pass an expert_id
+Transition = namedtuple('Transition', ['source', 'target', 'actors', 'values', 'assigns_expert'],
+                        defaults=({}, False))
+
+TRANSITIONS = {(t.source, t.target): t for t in [
+    Transition(JobStatus.DRAFT, JobStatus.PENDING_APPROVAL, (CLIENT,)),
+    Transition(JobStatus.DRAFT, JobStatus.CLOSED, (CLIENT,)),
+    Transition(JobStatus.PENDING_APPROVAL, JobStatus.ACTIVE, (), {'approved_by_admin': True}),
+    Transition(JobStatus.PENDING_APPROVAL, JobStatus.DRAFT, (CLIENT,)),
+    Transition(JobStatus.PENDING_APPROVAL, JobStatus.CLOSED, (CLIENT,)),
+    Transition(JobStatus.ACTIVE, JobStatus.IN_PROGRESS, (CLIENT,), assigns_expert=True),
+    Transition(JobStatus.ACTIVE, JobStatus.CLOSED, (CLIENT,)),
+    Transition(JobStatus.IN_PROGRESS, JobStatus.DELIVERED, (EXPERT,)),
+    Transition(JobStatus.IN_PROGRESS, JobStatus.DISPUTED, (CLIENT, EXPERT)),
+    Transition(JobStatus.DELIVERED, JobStatus.COMPLETED, (CLIENT,)),
+    Transition(JobStatus.DELIVERED, JobStatus.IN_PROGRESS, (CLIENT,)),  # revisions requested
+    Transition(JobStatus.DELIVERED, JobStatus.DISPUTED, (CLIENT, EXPERT)),
+    Transition(JobStatus.DISPUTED, JobStatus.COMPLETED, ()),
+    Transition(JobStatus.DISPUTED, JobStatus.CLOSED, ()),
+]}
+
+class TransitionConflict(Exception):
+    """The job's status or version changed after it was read"""
+
+def allowed_targets(status):
+    return [target for source, target in TRANSITIONS if source == status]
+
+def is_party(principal, client_id, expert_id):
+    """Admins, the job's client and its assigned expert; nobody else may see or move the job's status"""
+    return principal.role == UserRole.ADMIN or principal.user_id == client_id or \
+        (expert_id is not None and principal.user_id == expert_id)
+
+def may_take(transition, principal, client_id, expert_id):
+    if principal.role == UserRole.ADMIN:
+        return True
+    return ((CLIENT in transition.actors and principal.user_id == client_id) or
+            (EXPERT in transition.actors and expert_id is not None and principal.user_id == expert_id))
+
+def transition_job(session, job_id, transition, version, returning=(Job.version,), values=None):
+    """Move job_id along transition if it is still at transition.source and version.
+
+    Returns the row of returning columns or raises TransitionConflict.
+    Runs in the caller's transaction; the caller commits.
+    """
+    row = session.execute(
+        update(Job)
+        .where(Job.id == job_id, Job.status == transition.source, Job.version == version)
+        .values(status=transition.target, version=Job.version + 1, updated_at=datetime.utcnow(),
+                **transition.values, **(values or {}))
+        .returning(*returning)
+        .execution_options(synchronize_session=False)
+    ).first()
+    if row is None:
+        raise TransitionConflict(f'Job {job_id} is no longer {transition.source.value} at version {version}')
+    return row
+
+def transition_jobs(session, job_ids, transition, returning=(Job.id,)):
+    """Take transition for every job in job_ids still at its source status, with one set-based UPDATE.
+
+    Returns (results, moved rows): results maps each job id to the target
+    status, 'not_found' or 'not_<source status>'. The status condition is the
+    concurrency guard and versions are bumped, so a client holding an old
+    version gets a conflict on its next single-job transition. The caller commits.
+    """
+    rows = session.execute(
+        update(Job)
+        .where(Job.id.in_(job_ids), Job.status == transition.source)
+        .values(status=transition.target, version=Job.version + 1, updated_at=datetime.utcnow(),
+                **transition.values)
+        .returning(*returning)
+        .execution_options(synchronize_session=False)
+    ).all()
+    moved = {row.id for row in rows}
+    results = {job_id: 'not_found' for job_id in job_ids}
+    remaining = [job_id for job_id in job_ids if job_id not in moved]
+    if remaining:
+        for job_id, in session.query(Job.id).filter(Job.id.in_(remaining)):
+            results[job_id] = f'not_{transition.source.value}'
+    results.update({job_id: transition.target.value for job_id in moved})
+    return results, rows
@@ -0,0 +1,149 @@
+import bisect
+import threading
+import time
+from collections import namedtuple
+from sqlalchemy import event, func, inspect
+from sqlalchemy.orm import Session
+from models import User, Job, UserRole, KYCStatus, BadgeType, JobStatus, ServiceType
+
+# Ranking weights: a point of trust score counts 1, badges and completed jobs add fixed bonuses
+BADGE_POINTS = {
+    BadgeType.TRIAL: 0,
+    BadgeType.RECOMMENDED: 10,
+    BadgeType.TRUSTED: 25,
+    BadgeType.CERTIFIED: 40
+}
+SAME_SERVICE_JOB_POINTS = 8
+OTHER_JOB_POINTS = 2
+
+# What the index keeps per eligible expert; completed maps ServiceType -> completed job count
+Expert = namedtuple('Expert', ['badge', 'trust_score', 'completed'])
+
+def match_score(expert, service_type):
+    same = expert.completed.get(service_type, 0)
+    other = sum(expert.completed.values()) - same
+    return ((expert.trust_score or 0) + BADGE_POINTS.get(expert.badge, 0) +
+            SAME_SERVICE_JOB_POINTS * same + OTHER_JOB_POINTS * other)
+
+class ExpertIndex:
+    """In-process ranking of verified, active experts for every ServiceType.
+
+    Each service type keeps a sorted list of (score, expert id), so a top-K
+    lookup reads K entries from its end. Changes are applied per expert:
+    mark_dirty(ids) makes the next lookup reload just those experts (their
+    user row and completed-job counts) and re-slot them. ORM commits mark
+    experts dirty automatically (see install_expert_index); code that updates
+    users or jobs with Core statements calls mark_dirty itself. The whole
+    index is reloaded after refresh_interval seconds to pick up other writers.
+    """
+
+    def __init__(self, refresh_interval=300):
+        self.refresh_interval = refresh_interval
+        self._lock = threading.Lock()
+        self._loaded_at = None
+        self._dirty = set()
+        self._experts = {}
+        self._rankings = {service_type: [] for service_type in ServiceType}
+
+    def mark_dirty(self, user_ids):
+        with self._lock:
+            if self._loaded_at is not None:
+                self._dirty.update(user_ids)
+
+    @staticmethod
+    def _load(session, user_ids=None):
+        """{user id: Expert or None (not eligible)} for user_ids, or every eligible expert"""
+        users = session.query(User.id, User.role, User.kyc_status, User.is_active, User.badge, User.trust_score)
+        completed = session.query(Job.expert_id, Job.service_type, func.count()) \
+            .filter(Job.status == JobStatus.COMPLETED, Job.expert_id.isnot(None))
+        if user_ids is None:
+            users = users.filter(User.role == UserRole.EXPERT, User.kyc_status == KYCStatus.VERIFIED)
+        else:
+            users = users.filter(User.id.in_(user_ids))
+            completed = completed.filter(Job.expert_id.in_(user_ids))
+        counts = {}
+        for expert_id, service_type, count in completed.group_by(Job.expert_id, Job.service_type):
+            counts.setdefault(expert_id, {})[service_type] = count
+        experts = dict.fromkeys(user_ids or ())
+        for row in users:
+            if row.role == UserRole.EXPERT and row.kyc_status == KYCStatus.VERIFIED and row.is_active is not False:
+                experts[row.id] = Expert(row.badge, row.trust_score, counts.get(row.id, {}))
+        return experts
+
+    def _slot(self, expert_id, expert):
+        """Replace expert_id's entries in every ranking; expert None removes it"""
+        old = self._experts.pop(expert_id, None)
+        for service_type, ranking in self._rankings.items():
+            if old is not None:
+                key = (match_score(old, service_type), expert_id)
+                position = bisect.bisect_left(ranking, key)
+                if position < len(ranking) and ranking[position] == key:
+                    del ranking[position]
+            if expert is not None:
+                bisect.insort(ranking, (match_score(expert, service_type), expert_id))
+        if expert is not None:
+            self._experts[expert_id] = expert
+
+    def _ensure_current(self, session):
+        with self._lock:
+            stale = self._loaded_at is None or time.monotonic() - self._loaded_at >= self.refresh_interval
+            dirty, self._dirty = self._dirty, set()
+        if stale:
+            experts = self._load(session)
+            rankings = {service_type: sorted((match_score(expert, service_type), expert_id)
+                                             for expert_id, expert in experts.items())
+                        for service_type in ServiceType}
+            with self._lock:
+                self._experts, self._rankings = experts, rankings
+                self._loaded_at = time.monotonic()
+        elif dirty:
+            changed = self._load(session, dirty)
+            with self._lock:
+                for expert_id, expert in changed.items():
+                    self._slot(expert_id, expert)
+
+    def top(self, session, service_type, limit=10, exclude=()):
+        """[(expert id, score, Expert)] best first"""
+        self._ensure_current(session)
+        with self._lock:
+            ranking = self._rankings.get(service_type, [])
+            result = []
+            for score, expert_id in reversed(ranking):
+                if expert_id in exclude:
+                    continue
+                result.append((expert_id, score, self._experts[expert_id]))
+                if len(result) == limit:
+                    break
+            return result
+
+    def stats(self):
+        with self._lock:
+            return {
+                'experts': len(self._experts),
+                'dirty': len(self._dirty),
+                'age_seconds': round(time.monotonic() - self._loaded_at, 1) if self._loaded_at else None
+            }
+
+def install_expert_index(index):
+    """Mark experts dirty when an ORM commit changes their user row or their jobs"""
+
+    @event.listens_for(Session, 'after_flush')
+    def collect_expert_changes(session, flush_context):
+        dirty = session.info.setdefault('expert_dirty', set())
+        for obj in (*session.new, *session.dirty, *session.deleted):
+            if isinstance(obj, User) and obj.id is not None:
+                dirty.add(obj.id)
+            elif isinstance(obj, Job):
+                # Both the previous and the new expert when the assignment changed
+                history = inspect(obj).attrs.expert_id.history
+                dirty.update(i for i in (*history.added, *history.unchanged, *history.deleted) if i is not None)
+
+    @event.listens_for(Session, 'after_commit')
+    def apply_expert_changes(session):
+        dirty = session.info.pop('expert_dirty', None)
+        if dirty:
+            index.mark_dirty(dirty)
+
+    @event.listens_for(Session, 'after_rollback')
+    def discard_expert_changes(session):
+        session.info.pop('expert_dirty', None)
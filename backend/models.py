@@ -1,8 +1,14 @@
-from sqlalchemy import create_engine, Column, Integer, String, Text, DateTime, Boolean, ForeignKey, Table, Enum as SQLEnum, Numeric
+from sqlalchemy import create_engine, Column, Integer, String, Text, DateTime, Boolean, ForeignKey, Table, Index, UniqueConstraint, Enum as SQLEnum, Numeric
 from sqlalchemy.ext.declarative import declarative_base
+from sqlalchemy import DDL, event, exc
+from sqlalchemy.engine import make_url
 from sqlalchemy.orm import relationship, sessionmaker
+from sqlalchemy.pool import QueuePool
 from datetime import datetime
 import enum
+import os
+import threading
+import time
 
 Base = declarative_base()
 
@@ -61,11 +67,18 @@ space_members = Table('space_members', Base.metadata,
 
 class User(Base):
     __tablename__ = 'users'
+    __table_args__ = (
+        # Admin user list filters: ?role= (alone or with ?kyc_status=) and ?kyc_status=
+        Index('ix_users_role_kyc_status', 'role', 'kyc_status'),
+        Index('ix_users_kyc_status', 'kyc_status'),
+        # Referral trees are walked downwards (see referrals.py)
+        Index('ix_users_recommended_by_id', 'recommended_by_id'),
+    )
     
     id = Column(Integer, primary_key=True)
     name = Column(String(100), nullable=False)
     email = Column(String(100), unique=True, nullable=False)
-    password = Column(String(64), nullable=False)
+    password = Column(String(255), nullable=False)  # see passwords.py for the format
     avatar = Column(String(10), nullable=False)
     role = Column(SQLEnum(UserRole), nullable=False, default=UserRole.COMPANY)
     kyc_status = Column(SQLEnum(KYCStatus), default=KYCStatus.PENDING)
@@ -100,19 +113,46 @@ class User(Base):
             'bio': self.bio,
             'is_active': self.is_active
         }
+    
+    def to_summary(self):
+        """Public profile card embedded in other resources"""
+        return {
+            'id': self.id,
+            'name': self.name,
+            'avatar': self.avatar,
+            'role': self.role.value if self.role else None,
+            'badge': self.badge.value if self.badge else None,
+            'kyc_status': self.kyc_status.value if self.kyc_status else None,
+            'trust_score': self.trust_score
+        }
 
 class Token(Base):
     __tablename__ = 'tokens'
+    __table_args__ = (
+        # Per-user cap eviction (newest first) and the expired-token reaper
+        Index('ix_tokens_user_created', 'user_id', 'created_at'),
+        Index('ix_tokens_expires_at', 'expires_at'),
+    )
     
     id = Column(Integer, primary_key=True)
     token = Column(String(100), unique=True, nullable=False)
     user_id = Column(Integer, ForeignKey('users.id'), nullable=False)
     created_at = Column(DateTime, default=datetime.utcnow)
+    expires_at = Column(DateTime, nullable=False)  # see tokens.py
     
     user = relationship('User', backref='tokens')
 
 class Job(Base):
     __tablename__ = 'jobs'
+    __table_args__ = (
+        # Keyset pagination for the jobs board: WHERE approved_by_admin ORDER BY created_at, id
+        Index('ix_jobs_approved_created_id', 'approved_by_admin', 'created_at', 'id'),
+        # Admin pending queue and other status filters
+        Index('ix_jobs_status_created', 'status', 'created_at'),
+        # A client's or expert's jobs
+        Index('ix_jobs_client_id', 'client_id'),
+        Index('ix_jobs_expert_id', 'expert_id'),
+    )
     
     id = Column(Integer, primary_key=True)
     title = Column(String(200), nullable=False)
@@ -125,9 +165,14 @@ class Job(Base):
     client_id = Column(Integer, ForeignKey('users.id'), nullable=False)
     expert_id = Column(Integer, ForeignKey('users.id'), nullable=True)
     approved_by_admin = Column(Boolean, default=False)
+    # Bumped by every write; status changes are conditional on it (see lifecycle.py)
+    version = Column(Integer, nullable=False, default=1, server_default='1')
     created_at = Column(DateTime, default=datetime.utcnow)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     
+    # ORM flushes of a Job also check and bump version, raising StaleDataError on a lost update
+    __mapper_args__ = {'version_id_col': version}
+    
     # Relationships
     client = relationship('User', foreign_keys=[client_id], back_populates='jobs_created')
     expert = relationship('User', foreign_keys=[expert_id], back_populates='jobs_assigned')
@@ -147,11 +192,34 @@ class Job(Base):
             'client_id': self.client_id,
             'expert_id': self.expert_id,
             'approved_by_admin': self.approved_by_admin,
+            'version': self.version,
             'created_at': self.created_at.isoformat() if self.created_at else None
         }
 
+# Full-text search over jobs (PostgreSQL only): a generated, weighted tsvector
+# column with a GIN index. Other databases use the in-process index in search.py.
+# Neither is in the Table metadata, so schema.py checks and adds them by name.
+JOB_SEARCH_CONFIG = 'english'
+JOB_SEARCH_COLUMN = (
+    f"search_vector tsvector GENERATED ALWAYS AS ("
+    f"setweight(to_tsvector('{JOB_SEARCH_CONFIG}', coalesce(title, '')), 'A') || "
+    f"setweight(to_tsvector('{JOB_SEARCH_CONFIG}', coalesce(description, '')), 'B')) STORED"
+)
+JOB_SEARCH_INDEX = 'ix_jobs_search_vector'
+event.listen(Job.__table__, 'after_create', DDL(
+    f"ALTER TABLE jobs ADD COLUMN {JOB_SEARCH_COLUMN}"
+).execute_if(dialect='postgresql'))
+event.listen(Job.__table__, 'after_create', DDL(
+    f"CREATE INDEX {JOB_SEARCH_INDEX} ON jobs USING GIN (search_vector)"
+).execute_if(dialect='postgresql'))
+
 class Escrow(Base):
     __tablename__ = 'escrows'
+    __table_args__ = (
+        # One escrow per job, enforced by the database so concurrent creates cannot both win;
+        # its index also serves every escrow lookup by job
+        UniqueConstraint('job_id', name='uq_escrows_job_id'),
+    )
     
     id = Column(Integer, primary_key=True)
     job_id = Column(Integer, ForeignKey('jobs.id'), nullable=False)
@@ -179,8 +247,28 @@ class Escrow(Base):
             'released_at': self.released_at.isoformat() if self.released_at else None
         }
 
+class IdempotencyKey(Base):
+    """Stored response for a request sent with an Idempotency-Key header"""
+    __tablename__ = 'idempotency_keys'
+    __table_args__ = (
+        UniqueConstraint('endpoint', 'key', name='uq_idempotency_keys_endpoint_key'),
+        Index('ix_idempotency_keys_expires_at', 'expires_at'),
+    )
+    
+    id = Column(Integer, primary_key=True)
+    endpoint = Column(String(100), nullable=False)
+    key = Column(String(255), nullable=False)
+    request_hash = Column(String(64), nullable=False)  # sha256 of method, path and body
+    status_code = Column(Integer, nullable=False)
+    response_body = Column(Text, nullable=False)
+    created_at = Column(DateTime, default=datetime.utcnow)
+    expires_at = Column(DateTime, nullable=False)
+
 class Milestone(Base):
     __tablename__ = 'milestones'
+    __table_args__ = (
+        Index('ix_milestones_job_id', 'job_id'),
+    )
     
     id = Column(Integer, primary_key=True)
     job_id = Column(Integer, ForeignKey('jobs.id'), nullable=False)
@@ -211,6 +299,11 @@ class Milestone(Base):
 
 class Dispute(Base):
     __tablename__ = 'disputes'
+    __table_args__ = (
+        # Admin ?status= filter; job detail and resolve look disputes up by job
+        Index('ix_disputes_status', 'status'),
+        Index('ix_disputes_job_id', 'job_id'),
+    )
     
     id = Column(Integer, primary_key=True)
     job_id = Column(Integer, ForeignKey('jobs.id'), nullable=False)
@@ -241,9 +334,43 @@ class Dispute(Base):
             'created_at': self.created_at.isoformat() if self.created_at else None
         }
 
+# Admin dashboard aggregates, one row per (metric, key); key is the enum name ('' for NULL).
+# PostgreSQL keeps them in the admin_stats materialized view, refreshed by stats.py;
+# other databases run this query for stats.py's periodic in-process snapshot.
+ADMIN_STATS_SQL = """
+SELECT 'users_by_role' AS metric, coalesce(CAST(role AS VARCHAR), '') AS key,
+       count(*) AS count, 0 AS total_amount, 0 AS platform_fee FROM users GROUP BY role
+UNION ALL
+SELECT 'users_by_kyc_status', coalesce(CAST(kyc_status AS VARCHAR), ''), count(*), 0, 0 FROM users GROUP BY kyc_status
+UNION ALL
+SELECT 'jobs_by_status', coalesce(CAST(status AS VARCHAR), ''), count(*), 0, 0 FROM jobs GROUP BY status
+UNION ALL
+SELECT 'jobs_pending_approval', '', count(*), 0, 0 FROM jobs WHERE status = 'PENDING_APPROVAL'
+UNION ALL
+SELECT 'escrows_by_status', coalesce(CAST(status AS VARCHAR), ''), count(*),
+       coalesce(sum(total_amount), 0), coalesce(sum(platform_fee), 0) FROM escrows GROUP BY status
+UNION ALL
+SELECT 'disputes_by_status', coalesce(CAST(status AS VARCHAR), ''), count(*), 0, 0 FROM disputes GROUP BY status
+"""
+event.listen(Base.metadata, 'after_create', DDL(
+    "CREATE MATERIALIZED VIEW IF NOT EXISTS admin_stats AS "
+    f"SELECT s.*, now() AS refreshed_at FROM ({ADMIN_STATS_SQL}) s"
+).execute_if(dialect='postgresql'))
+# REFRESH ... CONCURRENTLY needs a unique index; it also keeps the view readable during a refresh
+event.listen(Base.metadata, 'after_create', DDL(
+    "CREATE UNIQUE INDEX IF NOT EXISTS ix_admin_stats_metric_key ON admin_stats (metric, key)"
+).execute_if(dialect='postgresql'))
+event.listen(Base.metadata, 'before_drop', DDL(
+    "DROP MATERIALIZED VIEW IF EXISTS admin_stats"
+).execute_if(dialect='postgresql'))
+
 # Keep existing models for backward compatibility
 class Post(Base):
     __tablename__ = 'posts'
+    __table_args__ = (
+        # Keyset pagination for the feed: ORDER BY created_at, id
+        Index('ix_posts_created_id', 'created_at', 'id'),
+    )
     
     id = Column(Integer, primary_key=True)
     author = Column(String(100), nullable=False)
@@ -373,12 +500,114 @@ class Event(Base):
             'organizer': self.organizer
         }
 
-# Database setup function
-def init_db(database_url):
-    engine = create_engine(database_url)
-    Base.metadata.create_all(engine)
-    return engine
+# Database setup
+class PoolMetrics:
+    """Counters for connection pool checkouts, wait time and exhaustion"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self.checkouts = 0
+            self.timeouts = 0
+            self.connects = 0
+            self.total_wait = 0.0
+            self.max_wait = 0.0
+
+    def record_checkout(self, wait, timed_out=False):
+        with self._lock:
+            if timed_out:
+                self.timeouts += 1
+            else:
+                self.checkouts += 1
+            self.total_wait += wait
+            self.max_wait = max(self.max_wait, wait)
+
+    def record_connect(self):
+        with self._lock:
+            self.connects += 1
+
+    def snapshot(self):
+        with self._lock:
+            attempts = self.checkouts + self.timeouts
+            return {
+                'checkouts': self.checkouts,
+                'timeouts': self.timeouts,
+                'connects': self.connects,
+                'avg_wait_ms': round(self.total_wait / attempts * 1000, 3) if attempts else 0.0,
+                'max_wait_ms': round(self.max_wait * 1000, 3)
+            }
+
+pool_metrics = PoolMetrics()
+
+class InstrumentedQueuePool(QueuePool):
+    """QueuePool that records how long each checkout waited for a connection"""
+
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            conn = super()._do_get()
+        except exc.TimeoutError:
+            pool_metrics.record_checkout(time.perf_counter() - start, timed_out=True)
+            raise
+        pool_metrics.record_checkout(time.perf_counter() - start)
+        return conn
+
+    def _create_connection(self):
+        pool_metrics.record_connect()
+        return super()._create_connection()
+
+def _env_flag(name, default):
+    return os.getenv(name, str(default)).lower() in ('1', 'true', 'yes', 'on')
+
+def engine_options(database_url):
+    """create_engine keyword arguments, tuned from DB_* environment variables"""
+    url = make_url(database_url)
+    options = {'pool_pre_ping': _env_flag('DB_POOL_PRE_PING', True)}
+    if url.get_backend_name() == 'sqlite' and url.database in (None, '', ':memory:'):
+        return options
+    options.update({
+        'poolclass': InstrumentedQueuePool,
+        'pool_size': int(os.getenv('DB_POOL_SIZE', 10)),
+        'max_overflow': int(os.getenv('DB_MAX_OVERFLOW', 20)),
+        'pool_timeout': float(os.getenv('DB_POOL_TIMEOUT', 30)),
+        'pool_recycle': int(os.getenv('DB_POOL_RECYCLE', 1800)),
+    })
+    if url.get_driver_name() == 'psycopg':
+        # psycopg 3 switches a query to a server-side prepared statement after
+        # this many executions on a connection; None disables preparing entirely
+        threshold = os.getenv('DB_PREPARE_THRESHOLD', '5')
+        options['connect_args'] = {
+            'prepare_threshold': None if threshold.lower() == 'none' else int(threshold)
+        }
+    return options
+
+def create_db_engine(database_url):
+    return create_engine(database_url, **engine_options(database_url))
+
+def pool_status(engine):
+    pool = engine.pool
+    status = {'class': type(pool).__name__}
+    if isinstance(pool, QueuePool):
+        status.update({
+            'size': pool.size(),
+            'checked_in': pool.checkedin(),
+            'checked_out': pool.checkedout(),
+            'overflow': pool.overflow()
+        })
+    status.update(pool_metrics.snapshot())
+    return status
+
+_session_factories = {}
+
+def get_session_factory(engine):
+    """One sessionmaker per engine, built on first use"""
+    factory = _session_factories.get(engine)
+    if factory is None:
+        factory = _session_factories.setdefault(engine, sessionmaker(bind=engine))
+    return factory
 
 def get_session(engine):
-    Session = sessionmaker(bind=engine)
-    return Session()
+    return get_session_factory(engine)()
@@ -0,0 +1,27 @@
+from datetime import datetime
+from sqlalchemy import or_, update
+from models import User
+
+# Moderation queues are cleared in large batches; this bounds one request's IN list
+MAX_BATCH_SIZE = 5000
+
+def set_kyc_status(session, user_ids, status):
+    """Move every user in user_ids to KYC status with one set-based UPDATE.
+
+    Returns (results, changed ids): results maps each user id to the status
+    value, 'not_found' or 'already_<status>'. The caller commits.
+    """
+    changed = {user_id for user_id, in session.execute(
+        update(User)
+        .where(User.id.in_(user_ids), or_(User.kyc_status != status, User.kyc_status.is_(None)))
+        .values(kyc_status=status, updated_at=datetime.utcnow())
+        .returning(User.id)
+        .execution_options(synchronize_session=False)
+    )}
+    results = {user_id: 'not_found' for user_id in user_ids}
+    remaining = [user_id for user_id in user_ids if user_id not in changed]
+    if remaining:
+        for user_id, in session.query(User.id).filter(User.id.in_(remaining)):
+            results[user_id] = f'already_{status.value}'
+    results.update({user_id: status.value for user_id in changed})
+    return results, changed
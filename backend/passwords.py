@@ -0,0 +1,86 @@
+import base64
+import hashlib
+import hmac
+import os
+import secrets
+from concurrent.futures import ThreadPoolExecutor, TimeoutError
+
+# Hashes are stored as "scrypt$<n>$<r>$<p>$<salt>$<digest>" (base64 salt/digest),
+# so cost can be raised later without invalidating existing hashes.
+SCHEME = 'scrypt'
+SCRYPT_N = int(os.getenv('PASSWORD_SCRYPT_N', 2 ** 14))
+SCRYPT_R = int(os.getenv('PASSWORD_SCRYPT_R', 8))
+SCRYPT_P = int(os.getenv('PASSWORD_SCRYPT_P', 1))
+SALT_BYTES = 16
+DIGEST_BYTES = 32
+HASH_WORKERS = int(os.getenv('PASSWORD_HASH_WORKERS', 4))
+HASH_TIMEOUT = float(os.getenv('PASSWORD_HASH_TIMEOUT', 10))
+# Seconds a client is told to wait (Retry-After) when the pool is saturated
+BUSY_RETRY_AFTER = 5
+
+# Each scrypt call needs ~128 * n * r bytes; the pool caps how many run at once
+_executor = ThreadPoolExecutor(max_workers=HASH_WORKERS, thread_name_prefix='kdf')
+
+class PasswordHashBusy(Exception):
+    """The KDF pool did not run the hash within HASH_TIMEOUT"""
+
+def _b64encode(raw):
+    return base64.b64encode(raw).decode().rstrip('=')
+
+def _b64decode(text):
+    return base64.b64decode(text + '=' * (-len(text) % 4))
+
+def _scrypt(password, salt, n, r, p):
+    return hashlib.scrypt(password.encode(), salt=salt, n=n, r=r, p=p,
+                          maxmem=256 * n * r * p, dklen=DIGEST_BYTES)
+
+def _is_legacy(stored):
+    return len(stored) == 64 and '$' not in stored
+
+def hash_password(password, n=None, r=None, p=None):
+    n, r, p = n or SCRYPT_N, r or SCRYPT_R, p or SCRYPT_P
+    salt = secrets.token_bytes(SALT_BYTES)
+    digest = _scrypt(password, salt, n, r, p)
+    return f'{SCHEME}${n}${r}${p}${_b64encode(salt)}${_b64encode(digest)}'
+
+def verify_password(password, stored):
+    """Check a password against a scrypt hash or a legacy unsalted SHA-256 hex digest"""
+    if not stored:
+        return False
+    if _is_legacy(stored):
+        return hmac.compare_digest(hashlib.sha256(password.encode()).hexdigest(), stored)
+    try:
+        scheme, n, r, p, salt, digest = stored.split('$')
+        if scheme != SCHEME:
+            return False
+        expected = _b64decode(digest)
+        actual = _scrypt(password, _b64decode(salt), int(n), int(r), int(p))
+    except ValueError:
+        return False
+    return hmac.compare_digest(actual, expected)
+
+def needs_rehash(stored):
+    """True for legacy hashes and hashes made with other than the current cost settings"""
+    if _is_legacy(stored):
+        return True
+    parts = stored.split('$')
+    return len(parts) != 6 or parts[0] != SCHEME or \
+        (int(parts[1]), int(parts[2]), int(parts[3])) != (SCRYPT_N, SCRYPT_R, SCRYPT_P)
+
+def _offload(fn, *args):
+    """fn(*args) on the bounded KDF pool, or PasswordHashBusy after HASH_TIMEOUT"""
+    future = _executor.submit(fn, *args)
+    try:
+        return future.result(timeout=HASH_TIMEOUT)
+    except TimeoutError:
+        # Drop the job if it is still queued so it does not add to the backlog that delayed it
+        future.cancel()
+        raise PasswordHashBusy('Password hashing timed out')
+
+def hash_password_offloaded(password):
+    """hash_password run on the bounded KDF pool"""
+    return _offload(hash_password, password)
+
+def verify_password_offloaded(password, stored):
+    """verify_password run on the bounded KDF pool"""
+    return _offload(verify_password, password, stored)
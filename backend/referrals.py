@@ -0,0 +1,38 @@
+"""Referral chains over users.recommended_by_id, one recursive CTE per lookup.
+
+Walking up follows the primary key and walking down follows
+ix_users_recommended_by_id, so a lookup N levels deep is a single statement
+doing one index probe per user it reaches. MAX_DEPTH bounds every walk, which
+also stops a recommendation cycle in bad data from recursing forever.
+"""
+from sqlalchemy import func, literal, select
+from models import User
+
+MAX_DEPTH = 100
+
+_users = User.__table__
+
+def ancestors(user_id, max_depth=MAX_DEPTH):
+    """CTE (id, depth) of the users above user_id: its recommender at depth 1, theirs at 2, ..."""
+    anchor = select(_users.c.recommended_by_id.label('id'), literal(1).label('depth')) \
+        .where(_users.c.id == user_id, _users.c.recommended_by_id.isnot(None))
+    chain = anchor.cte('referral_ancestors', recursive=True)
+    step = select(_users.c.recommended_by_id, chain.c.depth + 1) \
+        .where(_users.c.id == chain.c.id, _users.c.recommended_by_id.isnot(None), chain.c.depth < max_depth)
+    return chain.union_all(step)
+
+def descendants(user_id, max_depth=MAX_DEPTH):
+    """CTE (id, depth) of everyone user_id recommended at depth 1, whom they recommended at 2, ..."""
+    anchor = select(_users.c.id, literal(1).label('depth')).where(_users.c.recommended_by_id == user_id)
+    chain = anchor.cte('referral_descendants', recursive=True)
+    step = select(_users.c.id, chain.c.depth + 1) \
+        .where(_users.c.recommended_by_id == chain.c.id, chain.c.depth < max_depth)
+    return chain.union_all(step)
+
+def subtree_size(session, user_id, max_depth=MAX_DEPTH):
+    """(total, {depth: count}) of the users below user_id"""
+    chain = descendants(user_id, max_depth)
+    by_depth = dict(session.execute(
+        select(chain.c.depth, func.count()).group_by(chain.c.depth).order_by(chain.c.depth)
+    ).all())
+    return sum(by_depth.values()), by_depth
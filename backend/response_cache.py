@@ -0,0 +1,95 @@
+import hashlib
+import threading
+import time
+from collections import OrderedDict, namedtuple
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+CacheEntry = namedtuple('CacheEntry', ['body', 'etag', 'mimetype', 'expires_at'])
+
+class ResponseCache:
+    """Bounded LRU of pre-encoded response bodies keyed by endpoint and view arguments.
+
+    Each entry is tagged with the tables its view reads. ORM commits that touch
+    one of those tables drop the tagged entries. Writes made outside this
+    process (another worker, bulk COPY) are not seen, so entries also expire
+    after ttl seconds.
+    """
+
+    def __init__(self, max_size=1000, ttl=300):
+        self.max_size = max_size
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._keys_by_table = {}
+        self._generations = {}
+        self._lock = threading.Lock()
+
+    def generation(self, tables):
+        """Opaque token that changes whenever one of tables is invalidated"""
+        with self._lock:
+            return tuple(self._generations.get(table, 0) for table in tables)
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry.expires_at <= time.monotonic():
+                del self._entries[key]
+                entry = None
+            if entry is None:
+                self.misses += 1
+            else:
+                self._entries.move_to_end(key)
+                self.hits += 1
+            return entry
+
+    def put(self, key, tables, body, mimetype, generation):
+        """Store body unless one of tables was invalidated since generation was taken"""
+        entry = CacheEntry(body, hashlib.blake2b(body, digest_size=16).hexdigest(), mimetype,
+                           time.monotonic() + self.ttl)
+        with self._lock:
+            if tuple(self._generations.get(table, 0) for table in tables) == generation:
+                self._entries[key] = entry
+                self._entries.move_to_end(key)
+                for table in tables:
+                    self._keys_by_table.setdefault(table, set()).add(key)
+                while len(self._entries) > self.max_size:
+                    evicted, _ = self._entries.popitem(last=False)
+                    for keys in self._keys_by_table.values():
+                        keys.discard(evicted)
+        return entry
+
+    def invalidate(self, tables):
+        with self._lock:
+            for table in tables:
+                self._generations[table] = self._generations.get(table, 0) + 1
+                for key in self._keys_by_table.pop(table, ()):
+                    self._entries.pop(key, None)
+
+    def stats(self):
+        with self._lock:
+            return {'size': len(self._entries), 'max_size': self.max_size, 'ttl': self.ttl,
+                    'hits': self.hits, 'misses': self.misses}
+
+def install_cache_invalidation(cache, models):
+    """Invalidate cache entries for models' tables when a session commits changes to them"""
+    watched = {model.__table__.name for model in models}
+
+    @event.listens_for(Session, 'after_flush')
+    def collect_changed_tables(session, flush_context):
+        changed = session.info.setdefault('response_cache_tables', set())
+        for obj in (*session.new, *session.dirty, *session.deleted):
+            table = getattr(obj, '__tablename__', None)
+            if table in watched:
+                changed.add(table)
+
+    @event.listens_for(Session, 'after_commit')
+    def invalidate_changed_tables(session):
+        changed = session.info.pop('response_cache_tables', None)
+        if changed:
+            cache.invalidate(changed)
+
+    @event.listens_for(Session, 'after_rollback')
+    def discard_changed_tables(session):
+        session.info.pop('response_cache_tables', None)
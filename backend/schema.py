@@ -0,0 +1,139 @@
+"""Explicit schema management, kept out of the request-serving startup path.
+
+    python schema.py check     # exit status 1 if tables, columns, indexes, unique constraints or views are missing
+    python schema.py create    # create missing tables and indexes (and jobs.search_vector on PostgreSQL);
+                               # never drops or alters anything else
+
+Workers never inspect or create the schema themselves: run `check` from a
+deploy step or readiness probe, and `create` once per release.
+"""
+import argparse
+import os
+import sys
+from sqlalchemy import UniqueConstraint, inspect, text
+from models import JOB_SEARCH_COLUMN, JOB_SEARCH_INDEX, Base, create_db_engine
+
+def schema_problems(engine):
+    """Differences between the models and the live database, as readable strings"""
+    inspector = inspect(engine)
+    existing = set(inspector.get_table_names())
+    problems = []
+    for table in Base.metadata.sorted_tables:
+        if table.name not in existing:
+            problems.append(f'missing table {table.name}')
+            continue
+        columns = {column['name'] for column in inspector.get_columns(table.name)}
+        for column in table.columns:
+            if column.name not in columns:
+                problems.append(f'missing column {table.name}.{column.name}')
+        indexes = {index['name'] for index in inspector.get_indexes(table.name)}
+        for index in table.indexes:
+            if index.name not in indexes:
+                problems.append(f'missing index {index.name} on {table.name}')
+        # Compared by columns: SQLite does not always report constraint names
+        unique = {tuple(c['column_names']) for c in inspector.get_unique_constraints(table.name)}
+        unique |= {tuple(i['column_names']) for i in inspector.get_indexes(table.name) if i['unique']}
+        for constraint in table.constraints:
+            unique_columns = tuple(constraint.columns.keys())
+            if isinstance(constraint, UniqueConstraint) and unique_columns not in unique:
+                problems.append(f'missing unique constraint {constraint.name or unique_columns} on {table.name}')
+    if engine.dialect.name == 'postgresql' and 'jobs' in existing:
+        # Full-text search column and index live outside the Table metadata (see models.py)
+        if 'search_vector' not in {column['name'] for column in inspector.get_columns('jobs')}:
+            problems.append('missing column jobs.search_vector')
+        if JOB_SEARCH_INDEX not in {index['name'] for index in inspector.get_indexes('jobs')}:
+            problems.append(f'missing index {JOB_SEARCH_INDEX} on jobs')
+    if engine.dialect.name == 'postgresql':
+        # Read by /api/admin/stats; refreshing it CONCURRENTLY needs its unique index
+        if 'admin_stats' not in inspector.get_materialized_view_names():
+            problems.append('missing materialized view admin_stats')
+        elif 'ix_admin_stats_metric_key' not in {index['name'] for index in inspector.get_indexes('admin_stats')}:
+            problems.append('missing index ix_admin_stats_metric_key on admin_stats')
+    return problems
+
+def add_missing_indexes(engine):
+    """Create the model indexes that existing tables lack; returns their names.
+
+    create_all only indexes the tables it creates, so this is how new indexes
+    reach an existing database. PostgreSQL builds them CONCURRENTLY, without
+    blocking writes to the table.
+    """
+    inspector = inspect(engine)
+    existing = set(inspector.get_table_names())
+    created = []
+    for table in Base.metadata.sorted_tables:
+        if table.name not in existing:
+            continue
+        present = {index['name'] for index in inspector.get_indexes(table.name)}
+        for index in sorted(table.indexes, key=lambda index: index.name):
+            if index.name in present:
+                continue
+            if engine.dialect.name == 'postgresql':
+                columns = ', '.join(column.name for column in index.columns)
+                unique = 'UNIQUE ' if index.unique else ''
+                # CONCURRENTLY cannot run inside a transaction block
+                with engine.connect().execution_options(isolation_level='AUTOCOMMIT') as conn:
+                    conn.execute(text(f'CREATE {unique}INDEX CONCURRENTLY IF NOT EXISTS {index.name} '
+                                      f'ON {table.name} ({columns})'))
+            else:
+                with engine.begin() as conn:
+                    index.create(conn, checkfirst=True)
+            created.append(index.name)
+    return created
+
+def add_job_search(engine):
+    """Add the PostgreSQL full-text column and GIN index to an existing jobs table; returns what was added.
+
+    Adding the stored generated column rewrites the table under an exclusive
+    lock, so it runs once, on the first `create` after upgrading.
+    """
+    inspector = inspect(engine)
+    added = []
+    if 'search_vector' not in {column['name'] for column in inspector.get_columns('jobs')}:
+        with engine.begin() as conn:
+            conn.execute(text(f'ALTER TABLE jobs ADD COLUMN IF NOT EXISTS {JOB_SEARCH_COLUMN}'))
+        added.append('jobs.search_vector')
+    if JOB_SEARCH_INDEX not in {index['name'] for index in inspector.get_indexes('jobs')}:
+        with engine.connect().execution_options(isolation_level='AUTOCOMMIT') as conn:
+            conn.execute(text(f'CREATE INDEX CONCURRENTLY IF NOT EXISTS {JOB_SEARCH_INDEX} '
+                              'ON jobs USING GIN (search_vector)'))
+        added.append(JOB_SEARCH_INDEX)
+    return added
+
+def create_schema(database_url):
+    """create_all plus missing indexes and search columns, on a short-lived engine that is disposed before returning"""
+    engine = create_db_engine(database_url)
+    try:
+        Base.metadata.create_all(engine)
+        for name in add_missing_indexes(engine):
+            print(f'created index {name}', file=sys.stderr)
+        if engine.dialect.name == 'postgresql':
+            for name in add_job_search(engine):
+                print(f'created {name}', file=sys.stderr)
+    finally:
+        engine.dispose()
+
+def main():
+    parser = argparse.ArgumentParser(description='Check or create the Trust Hub database schema')
+    parser.add_argument('command', choices=['check', 'create'])
+    parser.add_argument('--database-url', default=os.getenv('DATABASE_URL'),
+                        help='defaults to DATABASE_URL, then the app default')
+    args = parser.parse_args()
+    database_url = args.database_url
+    if database_url is None:
+        from app import DATABASE_URL as database_url
+
+    if args.command == 'create':
+        create_schema(database_url)
+    engine = create_db_engine(database_url)
+    try:
+        problems = schema_problems(engine)
+    finally:
+        engine.dispose()
+    for problem in problems:
+        print(problem)
+    print('schema ok' if not problems else f'{len(problems)} problem(s) found', file=sys.stderr)
+    sys.exit(1 if problems else 0)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,188 @@
+import math
+import re
+import threading
+import time
+from collections import Counter
+from decimal import Decimal
+from sqlalchemy import cast, event, func, literal_column
+from sqlalchemy.orm import Session
+from models import Job, JOB_SEARCH_CONFIG
+from serializers import JOB
+
+TITLE_WEIGHT = 1.0
+DESCRIPTION_WEIGHT = 0.4
+_TOKEN = re.compile(r'\w+')
+_STOPWORDS = frozenset('a an and are as at be by for from in is it of on or the to with'.split())
+
+def tokenize(text):
+    return [t for t in _TOKEN.findall((text or '').lower()) if t not in _STOPWORDS]
+
+def _apply_filters(query, service_type, min_budget, max_budget):
+    query = query.filter(Job.approved_by_admin == True)
+    if service_type is not None:
+        query = query.filter(Job.service_type == service_type)
+    if min_budget is not None:
+        query = query.filter(Job.budget >= min_budget)
+    if max_budget is not None:
+        query = query.filter(Job.budget <= max_budget)
+    return query
+
+class JobSearchIndex:
+    """In-process inverted index over approved jobs, for databases without tsvector.
+
+    Scores are TF-IDF with title terms weighted above description terms; all
+    query terms must match. There is no stemming, so results can differ
+    slightly from PostgreSQL's english configuration. The index is loaded on
+    first use, kept current from ORM commits in this process, and fully
+    reloaded after refresh_interval seconds to pick up other writers.
+    """
+
+    def __init__(self, refresh_interval=300):
+        self.refresh_interval = refresh_interval
+        self._lock = threading.Lock()
+        self._loaded_at = None
+        self._postings = {}
+        self._docs = {}
+
+    def _ensure_loaded(self, session):
+        with self._lock:
+            if self._loaded_at is not None and time.monotonic() - self._loaded_at < self.refresh_interval:
+                return
+        postings, docs = {}, {}
+        rows = session.query(Job.id, Job.title, Job.description, Job.service_type, Job.budget, Job.created_at) \
+            .filter(Job.approved_by_admin == True).yield_per(5000)
+        for row in rows:
+            self._index_into(postings, docs, *row)
+        with self._lock:
+            self._postings, self._docs = postings, docs
+            self._loaded_at = time.monotonic()
+
+    @staticmethod
+    def _index_into(postings, docs, job_id, title, description, service_type, budget, created_at):
+        weights = Counter()
+        for token in tokenize(title):
+            weights[token] += TITLE_WEIGHT
+        for token in tokenize(description):
+            weights[token] += DESCRIPTION_WEIGHT
+        for token, weight in weights.items():
+            postings.setdefault(token, {})[job_id] = weight
+        budget = Decimal(str(budget)) if budget is not None else Decimal(0)
+        docs[job_id] = (service_type, budget, created_at, tuple(weights))
+
+    def _remove(self, job_id):
+        doc = self._docs.pop(job_id, None)
+        if doc:
+            for token in doc[3]:
+                posting = self._postings.get(token)
+                if posting:
+                    posting.pop(job_id, None)
+                    if not posting:
+                        del self._postings[token]
+
+    def apply(self, upserts, deletes):
+        """Apply committed job changes: upserts are Job column snapshots, deletes are ids"""
+        with self._lock:
+            if self._loaded_at is None:
+                return
+            for job_id in deletes:
+                self._remove(job_id)
+            for snapshot in upserts:
+                self._remove(snapshot['id'])
+                if snapshot['approved_by_admin']:
+                    self._index_into(self._postings, self._docs, snapshot['id'], snapshot['title'],
+                                     snapshot['description'], snapshot['service_type'], snapshot['budget'],
+                                     snapshot['created_at'])
+
+    def search(self, session, q, service_type=None, min_budget=None, max_budget=None, limit=20, offset=0):
+        """Return ([(job_id, score or None)], has_more) for one page of results"""
+        self._ensure_loaded(session)
+        with self._lock:
+            def matches(job_id):
+                doc_type, budget, _, _ = self._docs[job_id]
+                return ((service_type is None or doc_type == service_type) and
+                        (min_budget is None or budget >= min_budget) and
+                        (max_budget is None or budget <= max_budget))
+
+            terms = tokenize(q)
+            if not q or not q.strip():
+                candidates = [job_id for job_id in self._docs if matches(job_id)]
+                candidates.sort(key=lambda job_id: (self._docs[job_id][2], job_id), reverse=True)
+                ranked = [(job_id, None) for job_id in candidates]
+            elif not terms:
+                ranked = []  # only stopwords or punctuation: PostgreSQL's tsquery is empty and matches nothing
+            else:
+                postings = [self._postings.get(term, {}) for term in terms]
+                postings.sort(key=len)
+                total = len(self._docs)
+                scores = {}
+                for job_id in postings[0]:
+                    if all(job_id in p for p in postings[1:]) and matches(job_id):
+                        scores[job_id] = sum(p[job_id] * math.log(1 + total / len(p)) for p in postings)
+                ranked = sorted(scores.items(), key=lambda item: (-item[1], -item[0]))
+        page = ranked[offset:offset + limit + 1]
+        return page[:limit], len(page) > limit
+
+# The Job columns an index upsert needs
+SNAPSHOT_COLUMNS = ('id', 'title', 'description', 'service_type', 'budget', 'created_at', 'approved_by_admin')
+
+def snapshot(job):
+    """Upsert snapshot for JobSearchIndex.apply from a Job or a row with the same columns"""
+    return {column: getattr(job, column) for column in SNAPSHOT_COLUMNS}
+
+def install_search_index(index):
+    """Keep index in sync with Job rows committed through ORM sessions"""
+
+    @event.listens_for(Session, 'after_flush')
+    def collect_job_changes(session, flush_context):
+        upserts = session.info.setdefault('search_upserts', [])
+        deletes = session.info.setdefault('search_deletes', [])
+        for obj in (*session.new, *session.dirty):
+            if isinstance(obj, Job):
+                upserts.append(snapshot(obj))
+        deletes.extend(obj.id for obj in session.deleted if isinstance(obj, Job))
+
+    @event.listens_for(Session, 'after_commit')
+    def apply_job_changes(session):
+        upserts = session.info.pop('search_upserts', None)
+        deletes = session.info.pop('search_deletes', None)
+        if upserts or deletes:
+            index.apply(upserts or [], deletes or [])
+
+    @event.listens_for(Session, 'after_rollback')
+    def discard_job_changes(session):
+        session.info.pop('search_upserts', None)
+        session.info.pop('search_deletes', None)
+
+def search_jobs(session, index, q, service_type=None, min_budget=None, max_budget=None, limit=20, offset=0):
+    """One page of approved jobs matching q, best first; returns (job dicts, has_more)"""
+    if session.get_bind().dialect.name == 'postgresql':
+        from sqlalchemy.dialects.postgresql import REGCONFIG  # imported here to keep it off other databases' startup
+        vector = literal_column('jobs.search_vector')
+        if q:
+            tsquery = func.websearch_to_tsquery(cast(JOB_SEARCH_CONFIG, REGCONFIG), q)
+            rank = func.ts_rank_cd(vector, tsquery)
+            query = JOB.query(session, rank.label('rank')).filter(vector.op('@@')(tsquery)) \
+                .order_by(rank.desc(), Job.id.desc())
+        else:
+            query = JOB.query(session, literal_column('NULL').label('rank')) \
+                .order_by(Job.created_at.desc(), Job.id.desc())
+        query = _apply_filters(query, service_type, min_budget, max_budget)
+        rows = query.limit(limit + 1).offset(offset).all()
+        has_more = len(rows) > limit
+        results = []
+        for row in rows[:limit]:
+            job = JOB.row(row)
+            job['rank'] = round(float(row.rank), 6) if row.rank is not None else None
+            results.append(job)
+        return results, has_more
+
+    ranked, has_more = index.search(session, q, service_type, min_budget, max_budget, limit, offset)
+    rows = {row.id: row for row in JOB.query(session).filter(Job.id.in_([job_id for job_id, _ in ranked]))} \
+        if ranked else {}
+    results = []
+    for job_id, score in ranked:
+        if job_id in rows:
+            job = JOB.row(rows[job_id])
+            job['rank'] = round(score, 6) if score is not None else None
+            results.append(job)
+    return results, has_more
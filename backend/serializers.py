@@ -0,0 +1,215 @@
+import csv
+import io
+import json
+from flask import Response
+from models import User, Job, Escrow, Milestone, Dispute, Post, Course, Space, Member, Event
+
+try:
+    import orjson
+except ImportError:  # optional: pip install orjson
+    orjson = None
+
+# Converters matching what the models' to_dict methods do per column type
+def enum_value(value):
+    return value.value if value else None
+
+def number(value):
+    return float(value) if value else 0
+
+def isoformat(value):
+    return value.isoformat() if value else None
+
+class RowSerializer:
+    """Builds to_dict-shaped dicts from column-only query rows.
+
+    fields is a list of (key, column, converter) where converter may be None.
+    Selecting just these columns skips ORM identity-map and instance overhead;
+    the dicts are identical to what the model's to_dict returns.
+    """
+
+    def __init__(self, fields):
+        self.keys = tuple(key for key, _, _ in fields)
+        self.columns = tuple(column for _, column, _ in fields)
+        self.converters = tuple(converter for _, _, converter in fields)
+        self._plain = all(converter is None for converter in self.converters)
+
+    def query(self, session, *extra_columns):
+        """session.query over the serialized columns; extra columns are selected but not serialized"""
+        return session.query(*self.columns, *extra_columns)
+
+    def row(self, row):
+        if self._plain:
+            return dict(zip(self.keys, row))
+        return {key: (value if convert is None else convert(value))
+                for key, value, convert in zip(self.keys, row, self.converters)}
+
+    def rows(self, rows):
+        return [self.row(row) for row in rows]
+
+def dumps(payload):
+    """Encode byte-for-byte like Flask's jsonify (sorted keys, compact, ASCII-only).
+
+    orjson is used when installed; it cannot escape non-ASCII text the way
+    jsonify does, so payloads containing any fall back to the json module.
+    """
+    if orjson is not None:
+        encoded = orjson.dumps(payload, option=orjson.OPT_SORT_KEYS)
+        if encoded.isascii():
+            return encoded + b'\n'
+    return json.dumps(payload, sort_keys=True, separators=(',', ':')).encode() + b'\n'
+
+def json_response(payload, status=200):
+    return Response(dumps(payload), status=status, mimetype='application/json')
+
+def ndjson_lines(serializer, rows):
+    """One JSON document per row, one row at a time"""
+    for row in rows:
+        yield dumps(serializer.row(row))
+
+def csv_lines(serializer, rows, batch_size=500):
+    """A header line, then CSV rows flushed every batch_size rows"""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(serializer.keys)
+    for count, row in enumerate(rows, 1):
+        writer.writerow(serializer.row(row).values())
+        if count % batch_size == 0:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+    yield buffer.getvalue()
+
+EXPORT_FORMATS = {
+    'ndjson': (ndjson_lines, 'application/x-ndjson'),
+    'csv': (csv_lines, 'text/csv')
+}
+
+USER = RowSerializer([
+    ('id', User.id, None),
+    ('name', User.name, None),
+    ('email', User.email, None),
+    ('avatar', User.avatar, None),
+    ('role', User.role, enum_value),
+    ('kyc_status', User.kyc_status, enum_value),
+    ('badge', User.badge, enum_value),
+    ('trust_score', User.trust_score, None),
+    ('company_name', User.company_name, None),
+    ('bio', User.bio, None),
+    ('is_active', User.is_active, None)
+])
+
+# User.to_summary()
+USER_SUMMARY = RowSerializer([
+    ('id', User.id, None),
+    ('name', User.name, None),
+    ('avatar', User.avatar, None),
+    ('role', User.role, enum_value),
+    ('badge', User.badge, enum_value),
+    ('kyc_status', User.kyc_status, enum_value),
+    ('trust_score', User.trust_score, None)
+])
+
+JOB = RowSerializer([
+    ('id', Job.id, None),
+    ('title', Job.title, None),
+    ('description', Job.description, None),
+    ('service_type', Job.service_type, enum_value),
+    ('status', Job.status, enum_value),
+    ('budget', Job.budget, number),
+    ('deadline', Job.deadline, isoformat),
+    ('deliverables', Job.deliverables, None),
+    ('client_id', Job.client_id, None),
+    ('expert_id', Job.expert_id, None),
+    ('approved_by_admin', Job.approved_by_admin, None),
+    ('version', Job.version, None),
+    ('created_at', Job.created_at, isoformat)
+])
+
+ESCROW = RowSerializer([
+    ('id', Escrow.id, None),
+    ('job_id', Escrow.job_id, None),
+    ('status', Escrow.status, enum_value),
+    ('total_amount', Escrow.total_amount, number),
+    ('platform_fee', Escrow.platform_fee, number),
+    ('funded_at', Escrow.funded_at, isoformat),
+    ('released_at', Escrow.released_at, isoformat)
+])
+
+MILESTONE = RowSerializer([
+    ('id', Milestone.id, None),
+    ('job_id', Milestone.job_id, None),
+    ('title', Milestone.title, None),
+    ('description', Milestone.description, None),
+    ('amount', Milestone.amount, number),
+    ('deadline', Milestone.deadline, isoformat),
+    ('status', Milestone.status, None),
+    ('delivered_at', Milestone.delivered_at, isoformat),
+    ('accepted_at', Milestone.accepted_at, isoformat)
+])
+
+DISPUTE = RowSerializer([
+    ('id', Dispute.id, None),
+    ('job_id', Dispute.job_id, None),
+    ('opened_by_id', Dispute.opened_by_id, None),
+    ('status', Dispute.status, enum_value),
+    ('reason', Dispute.reason, None),
+    ('resolution', Dispute.resolution, None),
+    ('decision', Dispute.decision, None),
+    ('created_at', Dispute.created_at, isoformat)
+])
+
+POST = RowSerializer([
+    ('id', Post.id, None),
+    ('author', Post.author, None),
+    ('avatar', Post.avatar, None),
+    ('timestamp', Post.timestamp, None),
+    ('content', Post.content, None),
+    ('imageUrl', Post.image_url, None),
+    ('likes', Post.likes, None),
+    ('comments', Post.comments, None),
+    ('shares', Post.shares, None)
+])
+
+COURSE = RowSerializer([
+    ('id', Course.id, None),
+    ('title', Course.title, None),
+    ('instructor', Course.instructor, None),
+    ('duration', Course.duration, None),
+    ('level', Course.level, None),
+    ('description', Course.description, None),
+    ('imageUrl', Course.image_url, None),
+    ('enrolled', Course.enrolled, None),
+    ('rating', Course.rating, None)
+])
+
+SPACE = RowSerializer([
+    ('id', Space.id, None),
+    ('name', Space.name, None),
+    ('description', Space.description, None),
+    ('memberCount', Space.member_count, None),
+    ('imageUrl', Space.image_url, None),
+    ('category', Space.category, None)
+])
+
+MEMBER = RowSerializer([
+    ('id', Member.id, None),
+    ('name', Member.name, None),
+    ('title', Member.title, None),
+    ('avatar', Member.avatar, None),
+    ('connections', Member.connections, None),
+    ('mutual', Member.mutual, None),
+    ('bio', Member.bio, None)
+])
+
+EVENT = RowSerializer([
+    ('id', Event.id, None),
+    ('title', Event.title, None),
+    ('date', Event.date, None),
+    ('time', Event.time, None),
+    ('location', Event.location, None),
+    ('description', Event.description, None),
+    ('imageUrl', Event.image_url, None),
+    ('attendees', Event.attendees, None),
+    ('category', Event.category, None),
+    ('organizer', Event.organizer, None)
+])
@@ -0,0 +1,70 @@
+"""Production launcher: a pre-fork gunicorn server around app.create_app().
+
+    python serve.py --bind 0.0.0.0:5000 --workers 8 --threads 8
+
+The master process imports the application code once (routes, models,
+serializers) and forks workers that share those pages copy-on-write. Each
+worker then builds its own engine and connection pool in post_fork, so no
+database socket is ever inherited across processes. The schema is only
+created when --create-schema is passed, once, in the master before forking.
+"""
+import argparse
+import multiprocessing
+import os
+
+from gunicorn.app.base import BaseApplication
+
+def post_fork(server, worker):
+    import app
+    app.create_app()
+    server.log.info('Worker %s created its database engine', worker.pid)
+
+class TrustHubServer(BaseApplication):
+
+    def __init__(self, options):
+        self.options = options
+        super().__init__()
+
+    def load_config(self):
+        for key, value in self.options.items():
+            self.cfg.set(key, value)
+
+    def load(self):
+        import app
+        return app.preload()
+
+def main():
+    parser = argparse.ArgumentParser(description='Run the Trust Hub API under gunicorn')
+    parser.add_argument('--bind', default=os.getenv('BIND', f"0.0.0.0:{os.getenv('PORT', 5000)}"))
+    parser.add_argument('--workers', type=int, default=int(os.getenv('WEB_CONCURRENCY', multiprocessing.cpu_count() * 2 + 1)))
+    parser.add_argument('--threads', type=int, default=int(os.getenv('WEB_THREADS', 4)),
+                        help='threads per worker (gthread worker class)')
+    parser.add_argument('--timeout', type=int, default=30)
+    parser.add_argument('--max-requests', type=int, default=10000,
+                        help='recycle a worker after this many requests (0 = never)')
+    parser.add_argument('--no-preload', action='store_true',
+                        help='import the app in each worker instead of once in the master')
+    parser.add_argument('--create-schema', action='store_true', help='run create_all before starting workers')
+    args = parser.parse_args()
+
+    if args.create_schema:
+        import app
+        from schema import create_schema
+        # Uses a temporary engine, disposed before forking so no connection is inherited
+        create_schema(app.DATABASE_URL)
+
+    TrustHubServer({
+        'bind': args.bind,
+        'workers': args.workers,
+        'worker_class': 'gthread',
+        'threads': args.threads,
+        'timeout': args.timeout,
+        'max_requests': args.max_requests,
+        'max_requests_jitter': args.max_requests // 10,
+        'preload_app': not args.no_preload,
+        'post_fork': post_fork,
+        'accesslog': '-',
+    }).run()
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,121 @@
+import threading
+import time
+from datetime import datetime
+from sqlalchemy import text
+from models import ADMIN_STATS_SQL, UserRole, KYCStatus, JobStatus, EscrowStatus, DisputeStatus
+
+# Arbitrary application-wide key so only one worker refreshes the view at a time
+REFRESH_LOCK_KEY = 815_001
+
+def _counts(rows, metric, enum_class):
+    """{enum value: count} for every member of enum_class, zero when absent"""
+    counts = {member.value: 0 for member in enum_class}
+    for row in rows.get(metric, ()):
+        counts[enum_class[row.key].value if row.key else 'unknown'] = row.count
+    return counts
+
+def summarize(rows, refreshed_at, source):
+    """Turn ADMIN_STATS_SQL rows into the /api/admin/stats payload"""
+    by_metric = {}
+    for row in rows:
+        by_metric.setdefault(row.metric, []).append(row)
+
+    escrows = {status.value: {'count': 0, 'total_amount': 0.0, 'platform_fees': 0.0} for status in EscrowStatus}
+    for row in by_metric.get('escrows_by_status', ()):
+        escrows[EscrowStatus[row.key].value if row.key else 'unknown'] = {
+            'count': row.count,
+            'total_amount': float(row.total_amount),
+            'platform_fees': float(row.platform_fee)
+        }
+    users_by_role = _counts(by_metric, 'users_by_role', UserRole)
+    jobs_by_status = _counts(by_metric, 'jobs_by_status', JobStatus)
+    disputes_by_status = _counts(by_metric, 'disputes_by_status', DisputeStatus)
+    pending = by_metric.get('jobs_pending_approval')
+    return {
+        'users': {
+            'total': sum(users_by_role.values()),
+            'by_role': users_by_role,
+            'by_kyc_status': _counts(by_metric, 'users_by_kyc_status', KYCStatus)
+        },
+        'jobs': {
+            'total': sum(jobs_by_status.values()),
+            'by_status': jobs_by_status,
+            'pending_approval': pending[0].count if pending else 0
+        },
+        'escrows': {
+            'total': sum(e['count'] for e in escrows.values()),
+            'total_amount': round(sum(e['total_amount'] for e in escrows.values()), 2),
+            'platform_fees': round(sum(e['platform_fees'] for e in escrows.values()), 2),
+            'by_status': escrows
+        },
+        'disputes': {
+            'total': sum(disputes_by_status.values()),
+            'by_status': disputes_by_status,
+            'open': disputes_by_status[DisputeStatus.OPEN.value] + disputes_by_status[DisputeStatus.UNDER_REVIEW.value]
+        },
+        'refreshed_at': refreshed_at.isoformat() if refreshed_at else None,
+        'source': source
+    }
+
+class AdminStats:
+    """Dashboard aggregates that never scan the big tables on a read.
+
+    On PostgreSQL reads come from the admin_stats materialized view, kept fresh
+    by StatsRefresher. Elsewhere the aggregate query runs at most once every
+    refresh_interval seconds per process and its summary is served from memory.
+    """
+
+    def __init__(self, refresh_interval=60):
+        self.refresh_interval = refresh_interval
+        self._snapshot = None
+        self._loaded_at = 0.0
+        self._lock = threading.Lock()
+
+    def get(self, session):
+        if session.get_bind().dialect.name == 'postgresql':
+            rows = session.execute(text(
+                'SELECT metric, key, count, total_amount, platform_fee, refreshed_at FROM admin_stats'
+            )).all()
+            return summarize(rows, max((row.refreshed_at for row in rows), default=None), 'materialized_view')
+        with self._lock:
+            if self._snapshot is None or time.monotonic() - self._loaded_at >= self.refresh_interval:
+                rows = session.execute(text(ADMIN_STATS_SQL)).all()
+                self._snapshot = summarize(rows, datetime.utcnow(), 'snapshot')
+                self._loaded_at = time.monotonic()
+            return self._snapshot
+
+def refresh_admin_stats(engine, max_age):
+    """REFRESH the view unless another worker holds the lock or refreshed it within max_age seconds.
+
+    Returns True when this call refreshed it.
+    """
+    with engine.begin() as conn:
+        if not conn.scalar(text('SELECT pg_try_advisory_xact_lock(:key)'), {'key': REFRESH_LOCK_KEY}):
+            return False
+        age = conn.scalar(text('SELECT extract(epoch FROM now() - max(refreshed_at)) FROM admin_stats'))
+        if age is not None and age < max_age:
+            return False
+        conn.execute(text('REFRESH MATERIALIZED VIEW CONCURRENTLY admin_stats'))
+        return True
+
+class StatsRefresher(threading.Thread):
+    """Daemon thread that refreshes the admin_stats materialized view every interval seconds"""
+
+    def __init__(self, engine, interval=60, logger=None):
+        super().__init__(name='stats-refresher', daemon=True)
+        self.engine = engine
+        self.interval = interval
+        self.logger = logger
+        self._stopped = threading.Event()
+
+    def run(self):
+        while not self._stopped.wait(self.interval):
+            try:
+                # Every worker runs one of these; the lock and age check make one of them do the work
+                refresh_admin_stats(self.engine, max_age=self.interval / 2)
+            except Exception:
+                if self.logger:
+                    self.logger.exception('Admin stats refresh failed')
+
+    def stop(self):
+        self._stopped.set()
@@ -0,0 +1,85 @@
+import os
+import secrets
+import threading
+import time
+from datetime import datetime, timedelta
+from sqlalchemy import delete, select
+from models import Token
+
+TOKEN_TTL = timedelta(seconds=int(os.getenv('TOKEN_TTL', 7 * 24 * 3600)))
+# Sliding sessions: a token used in the second half of its life is pushed out to a full TTL again
+TOKEN_SLIDING = os.getenv('TOKEN_SLIDING', 'true').lower() in ('1', 'true', 'yes', 'on')
+MAX_TOKENS_PER_USER = int(os.getenv('TOKEN_MAX_PER_USER', 10))
+
+def generate_token():
+    return secrets.token_urlsafe(32)
+
+def issue_token(session, user_id):
+    """Add a fresh token for user_id and drop the oldest ones beyond MAX_TOKENS_PER_USER.
+
+    Returns (token, evicted token strings); the caller commits and should evict
+    those strings from any token cache afterwards.
+    """
+    now = datetime.utcnow()
+    token = Token(token=generate_token(), user_id=user_id, created_at=now, expires_at=now + TOKEN_TTL)
+    session.add(token)
+    session.flush()
+    evicted = []
+    if MAX_TOKENS_PER_USER:
+        stale = session.query(Token.id, Token.token).filter(Token.user_id == user_id) \
+            .order_by(Token.created_at.desc(), Token.id.desc()).offset(MAX_TOKENS_PER_USER).all()
+        if stale:
+            session.query(Token).filter(Token.id.in_([row.id for row in stale])) \
+                .delete(synchronize_session=False)
+            evicted = [row.token for row in stale]
+    return token, evicted
+
+def slide_expiry(session, token_id, expires_at):
+    """Extend a token past its half-life when sliding sessions are on; returns the effective expiry"""
+    now = datetime.utcnow()
+    if not TOKEN_SLIDING or expires_at - now > TOKEN_TTL / 2:
+        return expires_at
+    expires_at = now + TOKEN_TTL
+    session.query(Token).filter_by(id=token_id).update({'expires_at': expires_at}, synchronize_session=False)
+    session.commit()
+    return expires_at
+
+def reap_expired(engine, model, batch_size=1000, pause=0.05):
+    """Delete rows of model past their expires_at in short batches so no transaction holds locks for long"""
+    total = 0
+    while True:
+        expired = select(model.id).where(model.expires_at < datetime.utcnow()).limit(batch_size)
+        if engine.dialect.name == 'postgresql':
+            expired = expired.with_for_update(skip_locked=True)
+        with engine.begin() as conn:
+            deleted = conn.execute(delete(model).where(model.id.in_(expired.scalar_subquery()))).rowcount
+        total += deleted
+        if deleted < batch_size:
+            return total
+        time.sleep(pause)
+
+class TokenReaper(threading.Thread):
+    """Daemon thread that deletes expired tokens (and rows of any other expiring models) every interval seconds"""
+
+    def __init__(self, engine, interval=3600, batch_size=1000, logger=None, models=(Token,)):
+        super().__init__(name='token-reaper', daemon=True)
+        self.engine = engine
+        self.interval = interval
+        self.batch_size = batch_size
+        self.logger = logger
+        self.models = models
+        self._stopped = threading.Event()
+
+    def run(self):
+        while not self._stopped.wait(self.interval):
+            for model in self.models:
+                try:
+                    deleted = reap_expired(self.engine, model, self.batch_size)
+                    if deleted and self.logger:
+                        self.logger.info('Reaper deleted %d expired rows from %s', deleted, model.__tablename__)
+                except Exception:
+                    if self.logger:
+                        self.logger.exception('Reaper failed on %s', model.__tablename__)
+
+    def stop(self):
+        self._stopped.set()
@@ -0,0 +1,145 @@
+"""Trust scores: a full batch recompute and O(1) incremental updates that agree with it.
+
+    python trust.py --chunk-size 10000    # recompute every user's score
+
+A user's trust_score is the sum of POINTS over the events in their history.
+The batch path aggregates each kind of event with one GROUP BY pass over its
+table into a dense per-user-id vector, then writes only the changed scores, a
+chunk of user ids per transaction. Live transitions call apply_events() in
+the same transaction instead, which adds each user's delta with one UPDATE.
+"""
+import argparse
+import os
+import sys
+import time
+from array import array
+from collections import Counter
+from sqlalchemy import bindparam, func, literal, select, update
+from models import User, Job, Escrow, Dispute, JobStatus, EscrowStatus, DisputeStatus
+
+POINTS = {
+    'job_completed_expert': 4,
+    'job_completed_client': 2,
+    'escrow_released': 2,
+    'escrow_refunded': -4,
+    'dispute_won': 3,
+    'dispute_lost': -6,
+    'recommended_someone': 1,
+    'was_recommended': 5
+}
+
+# Dispute.decision values and which side each one favours
+DECISION_WINNER = {'release': 'expert', 'refund': 'client'}
+
+_users = User.__table__
+_add_points = update(_users).where(_users.c.id == bindparam('user_id')) \
+    .values(trust_score=func.coalesce(_users.c.trust_score, 0) + bindparam('delta'))
+
+def apply_events(session, events):
+    """Add the points for (user_id, kind) events to the users' scores; returns the user ids touched.
+
+    Runs in the caller's transaction. Core UPDATEs skip ORM events, so callers
+    should tell caches keyed on users (e.g. the expert index) after committing.
+    """
+    deltas = Counter()
+    for user_id, kind in events:
+        if user_id is not None:
+            deltas[user_id] += POINTS[kind]
+    rows = [{'user_id': user_id, 'delta': delta} for user_id, delta in deltas.items() if delta]
+    if rows:
+        session.execute(_add_points, rows)
+    return set(deltas)
+
+def dispute_events(decision, expert_id, client_id, escrow_status=None):
+    """Events for a resolved dispute, plus the escrow release or refund it caused"""
+    events = []
+    winner = DECISION_WINNER.get(decision)
+    if winner:
+        won, lost = (expert_id, client_id) if winner == 'expert' else (client_id, expert_id)
+        events += [(won, 'dispute_won'), (lost, 'dispute_lost')]
+    if escrow_status == EscrowStatus.RELEASED:
+        events.append((expert_id, 'escrow_released'))
+    elif escrow_status == EscrowStatus.REFUNDED:
+        events.append((expert_id, 'escrow_refunded'))
+    return events
+
+def job_completed_events(expert_id, client_id):
+    return [(expert_id, 'job_completed_expert'), (client_id, 'job_completed_client')]
+
+def _aggregates():
+    """(kind, SELECT user_id, count) pairs, one GROUP BY pass per event kind"""
+    completed = Job.status == JobStatus.COMPLETED
+    resolved = Dispute.status == DisputeStatus.RESOLVED
+    disputes = select().select_from(Dispute).join(Job, Job.id == Dispute.job_id)
+    escrows = select().select_from(Escrow).join(Job, Job.id == Escrow.job_id)
+
+    def grouped(query, user_column, *criteria):
+        return query.add_columns(user_column, func.count()).where(*criteria).group_by(user_column)
+
+    return [
+        ('job_completed_expert', grouped(select(), Job.expert_id, completed)),
+        ('job_completed_client', grouped(select(), Job.client_id, completed)),
+        ('escrow_released', grouped(escrows, Job.expert_id, Escrow.status == EscrowStatus.RELEASED)),
+        ('escrow_refunded', grouped(escrows, Job.expert_id, Escrow.status == EscrowStatus.REFUNDED)),
+        ('dispute_won', grouped(disputes, Job.expert_id, resolved, Dispute.decision == 'release')),
+        ('dispute_lost', grouped(disputes, Job.client_id, resolved, Dispute.decision == 'release')),
+        ('dispute_won', grouped(disputes, Job.client_id, resolved, Dispute.decision == 'refund')),
+        ('dispute_lost', grouped(disputes, Job.expert_id, resolved, Dispute.decision == 'refund')),
+        ('recommended_someone', grouped(select(), User.recommended_by_id)),
+        ('was_recommended', select(User.id, literal(1)).where(User.recommended_by_id.isnot(None))),
+    ]
+
+def recompute_trust_scores(engine, chunk_size=10000, log=None):
+    """Recompute every user's trust_score; returns (users scanned, scores changed)"""
+    with engine.connect() as conn:
+        max_id = conn.scalar(select(func.max(User.id))) or 0
+        # One slot per user id, like a NumPy vector indexed by id
+        scores = array('q', bytes(8 * (max_id + 1)))
+        for kind, statement in _aggregates():
+            points = POINTS[kind]
+            started = time.perf_counter()
+            result = conn.execution_options(yield_per=chunk_size).execute(statement)
+            for user_id, count in result:
+                if user_id is not None and user_id <= max_id:
+                    scores[user_id] += points * count
+            if log:
+                log(f'  {kind}: {time.perf_counter() - started:.2f}s')
+
+    scanned = changed = 0
+    for low in range(0, max_id + 1, chunk_size):
+        high = low + chunk_size
+        with engine.begin() as conn:
+            current = conn.execute(select(User.id, User.trust_score)
+                                   .where(User.id >= low, User.id < high)).all()
+            rows = [{'user_id': user_id, 'score': scores[user_id]}
+                    for user_id, score in current if score != scores[user_id]]
+            if rows:
+                conn.execute(update(_users).where(_users.c.id == bindparam('user_id'))
+                             .values(trust_score=bindparam('score')), rows)
+        scanned += len(current)
+        changed += len(rows)
+    return scanned, changed
+
+def main():
+    parser = argparse.ArgumentParser(description='Recompute every user\'s trust score')
+    parser.add_argument('--chunk-size', type=int, default=10000, help='user ids per read/write batch')
+    parser.add_argument('--database-url', default=os.getenv('DATABASE_URL'),
+                        help='defaults to DATABASE_URL, then the app default')
+    args = parser.parse_args()
+    database_url = args.database_url
+    if database_url is None:
+        from app import DATABASE_URL as database_url
+
+    from models import create_db_engine
+    engine = create_db_engine(database_url)
+    started = time.perf_counter()
+    try:
+        scanned, changed = recompute_trust_scores(engine, args.chunk_size, log=lambda line: print(line, file=sys.stderr))
+    finally:
+        engine.dispose()
+    elapsed = time.perf_counter() - started
+    print(f'{scanned:,} users scored, {changed:,} changed in {elapsed:.1f}s '
+          f'({scanned / elapsed if elapsed else 0:,.0f} users/s)')
+
+if __name__ == '__main__':
+    main()
@@ -3,6 +3,8 @@ import { CommonModule } from '@angular/common';
 import { JobService, Job } from '../../services/job.service';
 import { AuthService, User } from '../../services/auth.service';
 
+const PAGE_SIZE = 20;
+
 @Component({
   selector: 'app-feed',
   standalone: true,
@@ -14,7 +16,10 @@ export class FeedComponent implements OnInit {
   selectedTab = 'All Jobs';
   tabs = ['All Jobs', 'My Jobs', 'In Progress', 'Completed'];
   jobs: Job[] = [];
+  loadedJobs: Job[] = [];
+  nextCursor: string | null = null;
   loading = false;
+  loadingMore = false;
   error: string | null = null;
   currentUser: User | null = null;
   
@@ -39,9 +44,11 @@ export class FeedComponent implements OnInit {
     this.loading = true;
     this.error = null;
     
-    this.jobService.getJobs().subscribe({
-      next: (data) => {
-        this.jobs = this.filterJobsByTab(data);
+    this.jobService.getJobs(PAGE_SIZE).subscribe({
+      next: (page) => {
+        this.loadedJobs = page.jobs;
+        this.nextCursor = page.next_cursor;
+        this.jobs = this.filterJobsByTab(this.loadedJobs);
         this.loading = false;
       },
       error: (err) => {
@@ -52,6 +59,25 @@ export class FeedComponent implements OnInit {
     });
   }
 
+  loadMore() {
+    if (!this.nextCursor || this.loadingMore) return;
+    this.loadingMore = true;
+    
+    this.jobService.getJobs(PAGE_SIZE, this.nextCursor).subscribe({
+      next: (page) => {
+        this.loadedJobs = this.loadedJobs.concat(page.jobs);
+        this.nextCursor = page.next_cursor;
+        this.jobs = this.filterJobsByTab(this.loadedJobs);
+        this.loadingMore = false;
+      },
+      error: (err) => {
+        this.error = 'Failed to load more jobs';
+        this.loadingMore = false;
+        console.error('Error loading jobs:', err);
+      }
+    });
+  }
+
   filterJobsByTab(jobs: Job[]): Job[] {
     if (!this.currentUser) return [];
 
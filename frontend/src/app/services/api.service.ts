@@ -1,5 +1,5 @@
 import { Injectable } from '@angular/core';
-import { HttpClient } from '@angular/common/http';
+import { HttpClient, HttpParams } from '@angular/common/http';
 import { Observable } from 'rxjs';
 import { map } from 'rxjs/operators';
 
@@ -16,6 +16,11 @@ export interface Post {
   shares: number;
 }
 
+export interface PostPage {
+  posts: Post[];
+  next_cursor: string | null;
+}
+
 export interface Course {
   id: number;
   title: string;
@@ -70,9 +75,13 @@ export class ApiService {
 
   constructor(private http: HttpClient) {}
 
-  getPosts(): Observable<Post[]> {
-    return this.http.get<{posts: Post[]}>(`${this.apiUrl}/posts`).pipe(
-      map(response => response.posts)
+  // One page, newest first; pass the previous page's next_cursor to get the next one
+  getPosts(limit?: number, cursor?: string | null): Observable<PostPage> {
+    let params = new HttpParams();
+    if (limit) params = params.set('limit', limit);
+    if (cursor) params = params.set('cursor', cursor);
+    return this.http.get<PostPage>(`${this.apiUrl}/posts`, { params }).pipe(
+      map(response => ({ posts: response.posts, next_cursor: response.next_cursor }))
     );
   }
 
@@ -1,7 +1,8 @@
 import { Injectable } from '@angular/core';
-import { HttpClient } from '@angular/common/http';
+import { HttpClient, HttpHeaders, HttpParams } from '@angular/common/http';
 import { Observable } from 'rxjs';
 import { map } from 'rxjs/operators';
+import { AuthService } from './auth.service';
 
 export interface Job {
   id: number;
@@ -15,6 +16,7 @@ export interface Job {
   client_id: number;
   expert_id?: number;
   approved_by_admin: boolean;
+  version: number;
   created_at: string;
   escrow?: Escrow;
   milestones?: Milestone[];
@@ -42,6 +44,11 @@ export interface Milestone {
   accepted_at?: string;
 }
 
+export interface JobPage {
+  jobs: Job[];
+  next_cursor: string | null;
+}
+
 export interface CreateJobRequest {
   title: string;
   description: string;
@@ -59,11 +66,19 @@ export interface CreateJobRequest {
 export class JobService {
   private apiUrl = 'http://localhost:5001/api';
 
-  constructor(private http: HttpClient) {}
+  constructor(private http: HttpClient, private authService: AuthService) {}
+
+  private authHeaders(): HttpHeaders {
+    return new HttpHeaders({ Authorization: `Bearer ${this.authService.getToken()}` });
+  }
 
-  getJobs(): Observable<Job[]> {
-    return this.http.get<{jobs: Job[]}>(`${this.apiUrl}/jobs`)
-      .pipe(map(response => response.jobs));
+  // One page, newest first; pass the previous page's next_cursor to get the next one
+  getJobs(limit?: number, cursor?: string | null): Observable<JobPage> {
+    let params = new HttpParams();
+    if (limit) params = params.set('limit', limit);
+    if (cursor) params = params.set('cursor', cursor);
+    return this.http.get<JobPage>(`${this.apiUrl}/jobs`, { params })
+      .pipe(map(response => ({ jobs: response.jobs, next_cursor: response.next_cursor })));
   }
 
   getJob(id: number): Observable<Job> {
@@ -77,12 +92,12 @@ export class JobService {
   }
 
   submitJobForApproval(jobId: number): Observable<Job> {
-    return this.http.post<{job: Job, message: string}>(`${this.apiUrl}/jobs/${jobId}/submit`, {})
+    return this.http.post<{job: Job, message: string}>(`${this.apiUrl}/jobs/${jobId}/submit`, {}, { headers: this.authHeaders() })
       .pipe(map(response => response.job));
   }
 
   approveJob(jobId: number): Observable<Job> {
-    return this.http.post<{job: Job, message: string}>(`${this.apiUrl}/jobs/${jobId}/approve`, {})
+    return this.http.post<{job: Job, message: string}>(`${this.apiUrl}/jobs/${jobId}/approve`, {}, { headers: this.authHeaders() })
       .pipe(map(response => response.job));
   }
 